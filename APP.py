@@ -9,6 +9,20 @@ from sklearn.model_selection import train_test_split
 from statsmodels.tsa.arima.model import ARIMA
 import json
 import requests
+from columnar_store import load_table
+from normalize import parse_discount
+from sentiment_aggregates import daily_sentiment, label_counts
+from sentiment_cascade import cascade_model_id
+from forecast_store import AUTO_ORDER, stored_forecast
+from arima_order import chosen_order
+from forecast_cache import cached_forecast, get_forecast_cache
+from fast_forecast import LIVE_ARIMA_MAX_POINTS, forecast_series
+from model_store import RANDOM_FOREST_PARAMS, cached_model
+from feature_store import feature_matrix
+from sql_store import bootstrap, connect, latest_date, latest_snapshot, list_products, product_history, reviews_for_product
+
+# ARIMA order for live fits of products that have no searched order yet
+DEFAULT_ARIMA_ORDER = (1, 0, 0)
 
 # Page config
 st.set_page_config(
@@ -35,32 +49,38 @@ st.markdown("""
 # Load Data
 @st.cache_data(ttl=3600)
 def load_data():
-    competitor_data = pd.read_csv("competitor_data.csv")
+    competitor_data = load_table("competitor_data.csv")
     competitor_data['date'] = pd.to_datetime(competitor_data['date'])
-    reviews_data = pd.read_csv("reviews.csv")
+    reviews_data = load_table("reviews.csv")
     reviews_data['date'] = pd.to_datetime(reviews_data['date'])
     return competitor_data, reviews_data
 
-def mock_sentiment_analysis(reviews):
-    """Mock sentiment analysis function to replace transformers."""
-    # Assuming a basic positive sentiment for testing purposes.
-    return pd.DataFrame([
-        {'label': 'POSITIVE', 'score': 0.99} for _ in reviews
-    ])
+def get_store():
+    """Open the indexed store, seeding it from the history files on first run."""
+    store = connect()
+    bootstrap(store, lambda: load_data()[0], lambda: load_data()[1])
+    return store
+
+def load_product_history(store, product_name, start=None, end=None):
+    """Load one product's history for a date range with an indexed query."""
+    history = product_history(store, product_name, start, end)
+    history['date'] = pd.to_datetime(history['date'])
+    return history
 
-def train_price_predictor(data):
-    """Train Random Forest model for price prediction."""
-    X = data[['Price', 'Discount']]
-    y = data['Price'].shift(-1)
-    y = y.fillna(method='ffill')
+def train_price_predictor(store, products=None):
+    """Train Random Forest model for next-day price prediction."""
+    # Lags, rolling stats and next-day targets are kept per product, so no row borrows another product's price
+    X, y, _ = feature_matrix(store, 'next_price', products=products)
     
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=42
     )
     
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
-    model.fit(X_train, y_train)
-    return model
+    # Stored per training set; a changed set is retrained on all cores in the background
+    return cached_model(
+        'price_predictor', X_train, y_train, RANDOM_FOREST_PARAMS,
+        lambda: RandomForestRegressor(**RANDOM_FOREST_PARAMS, n_jobs=-1).fit(X_train, y_train),
+    )
 
 # def forecast_discounts(data, days=7):
 #     """Forecast discounts using ARIMA."""
@@ -80,23 +100,19 @@ def train_price_predictor(data):
 #         'Date': future_dates,
 #         'Predicted_Discount': forecast
 #     })
-def forecast_discounts(data, days=7):
+def forecast_discounts(data, days=7, order=DEFAULT_ARIMA_ORDER):
     """Forecast discounts using ARIMA."""
     
     if not isinstance(data.index, pd.DatetimeIndex):
         data = data.set_index('date')
 
     # Ensure discount column is numeric
-    data['discount'] = pd.to_numeric(data['discount'], errors='coerce')
+    data['discount'] = parse_discount(data['discount'])
     data = data.dropna(subset=['discount'])  # Remove NaN values
     
-    # Ensure enough data points
-    if len(data) > 5:
-        raise ValueError("Not enough data points for ARIMA forecasting.")
-
-    # Ensure non-constant discount values
-    if data['discount'].std() == 0:
-        raise ValueError("Constant discount values cannot be used for ARIMA.")
+    # Too short, constant or too long to fit live: use the vectorized fast path
+    if len(data) < 5 or data['discount'].std() == 0 or len(data) > LIVE_ARIMA_MAX_POINTS:
+        return forecast_series(data['discount'], days).reset_index()
 
     # Set explicit date frequency
     try:
@@ -104,24 +120,32 @@ def forecast_discounts(data, days=7):
     except:
         data = data.asfreq('D')  # Force daily frequency
 
-    # Fit ARIMA
-    model = ARIMA(data['discount'], order=(1,0,0))
-    model_fit = model.fit()
+    def fit():
+        # Fit ARIMA
+        try:
+            model = ARIMA(data['discount'], order=order)
+            model_fit = model.fit()
+        except Exception:
+            return forecast_series(data['discount'], days).reset_index()
 
-    # Forecast
-    forecast = model_fit.forecast(steps=days)
-    future_dates = pd.date_range(
-        start=data.index[-1] + pd.Timedelta(days=1),
-        periods=days
-    )
+        # Forecast
+        forecast = model_fit.forecast(steps=days)
+        future_dates = pd.date_range(
+            start=data.index[-1] + pd.Timedelta(days=1),
+            periods=days
+        )
+
+        return pd.DataFrame({'Date': future_dates, 'Predicted_Discount': forecast})
 
-    return pd.DataFrame({'Date': future_dates, 'Predicted_Discount': forecast})
+    # Reruns with an unchanged series reuse the cached forecast
+    product = data['product_name'].iloc[0] if 'product_name' in data.columns else None
+    return cached_forecast(product, order, data['discount'], days, fit)
 
 
-def calculate_market_position(data, product_name):
+def calculate_market_position(latest_data, product_history_data):
     """Calculate market position metrics."""
-    product_data = data[data['product_name'] == product_name].iloc[-1]
-    all_products = data[data['date'] == data['date'].max()]
+    product_data = product_history_data.iloc[-1]
+    all_products = latest_data
     
     price_percentile = (all_products['price'] < product_data['price']).mean() * 100
     discount_percentile = (all_products['discount'] < product_data['discount']).mean() * 100
@@ -148,7 +172,10 @@ def generate_recommendations(market_position, sentiment_data, forecast_data):
         recommendations.append("Increase promotional activities to match competitor discounts")
     
     # Sentiment-based recommendations
-    sentiment_counts = sentiment_data['label'].value_counts()
+    if 'count' in sentiment_data.columns:
+        sentiment_counts = sentiment_data.set_index('label')['count']
+    else:
+        sentiment_counts = sentiment_data['label'].value_counts()
     if 'NEGATIVE' in sentiment_counts and sentiment_counts['NEGATIVE'] > sentiment_counts.get('POSITIVE', 0):
         recommendations.append("Address customer concerns to improve sentiment")
         
@@ -159,29 +186,31 @@ def main():
     st.title("📊 Realtime Competitor Strategy AI Dashboard")
     
     # Load data
-    competitor_data, reviews_data = load_data()
+    store = get_store()
+    max_date = latest_date(store)
     
     # Sidebar filters
     st.sidebar.header("Filters")
     selected_product = st.sidebar.selectbox(
         "Select Product",
-        competitor_data['product_name'].unique()
+        list_products(store)
     )
     
     date_range = st.sidebar.date_input(
         "Date Range",
         [
-            competitor_data['date'].max() - timedelta(days=30),
-            competitor_data['date'].max()
+            max_date - timedelta(days=30),
+            max_date
         ]
     )
     
     # Filter data
-    filtered_data = competitor_data[
-        (competitor_data['date'] >= pd.Timestamp(date_range[0])) &
-        (competitor_data['date'] <= pd.Timestamp(date_range[1])) &
-        (competitor_data['product_name'] == selected_product)
-    ]
+    filtered_data = load_product_history(
+        store,
+        selected_product,
+        pd.Timestamp(date_range[0]),
+        pd.Timestamp(date_range[1])
+    )
     
     # Layout
     col1, col2 = st.columns(2)
@@ -210,7 +239,10 @@ def main():
     
     # Market Position
     st.subheader("Market Position Analysis")
-    market_position = calculate_market_position(competitor_data, selected_product)
+    market_position = calculate_market_position(
+        latest_snapshot(store),
+        load_product_history(store, selected_product)
+    )
     
     col3, col4, col5 = st.columns(3)
     
@@ -237,20 +269,35 @@ def main():
     
     # Sentiment Analysis
     st.subheader("Customer Sentiment Analysis")
-    product_reviews = reviews_data[reviews_data['product_name'] == selected_product]
+    product_reviews = reviews_for_product(store, selected_product, with_text=False)
     
     if not product_reviews.empty:
-        sentiments = mock_sentiment_analysis(product_reviews['review'].tolist())
+        # Daily aggregates scored offline by refresh_job.py
+        daily_sentiments = daily_sentiment(store, selected_product, cascade_model_id())
+        sentiments = label_counts(daily_sentiments)
+        if daily_sentiments.empty:
+            st.info("Sentiment for this product has not been scored yet; run refresh_job.py.")
         fig_sentiment = px.pie(
             sentiments,
             names='label',
+            values='count',
             title='Sentiment Distribution'
         )
         st.plotly_chart(fig_sentiment, use_container_width=True)
+        if not daily_sentiments.empty:
+            fig_trend = px.line(daily_sentiments, x='date', y=['rolling_7d', 'rolling_30d'],
+                                title='Sentiment Trend (7/30-day rolling)')
+            st.plotly_chart(fig_trend, use_container_width=True)
     
     # Forecasting
     st.subheader("Price & Discount Forecasting")
-    forecast_data = forecast_discounts(filtered_data)
+    # Precomputed by refresh_job.py; fit on the spot when nothing current is stored
+    forecast_data = stored_forecast(store, selected_product, AUTO_ORDER).reset_index()
+    if forecast_data.empty:
+        forecast_data = forecast_discounts(filtered_data, order=chosen_order(store, selected_product) or DEFAULT_ARIMA_ORDER)
+        forecast_stats = get_forecast_cache().stats()
+        st.caption(f"Forecast cache: {forecast_stats['hits']} hits, {forecast_stats['misses']} misses, "
+                   f"{forecast_stats['entries']} entries, {forecast_stats['evictions']} evicted")
     
     fig_forecast = go.Figure()
     fig_forecast.add_trace(go.Scatter(
@@ -264,6 +311,15 @@ def main():
         name='Forecasted Discounts',
         line=dict(dash='dash')
     ))
+    if 'Upper_Bound' in forecast_data.columns:
+        fig_forecast.add_trace(go.Scatter(
+            x=pd.concat([forecast_data['Date'], forecast_data['Date'][::-1]]),
+            y=pd.concat([forecast_data['Upper_Bound'], forecast_data['Lower_Bound'][::-1]]),
+            fill='toself',
+            line=dict(width=0),
+            opacity=0.2,
+            name='95% Confidence Interval'
+        ))
     st.plotly_chart(fig_forecast, use_container_width=True)
     
     # Strategic Recommendations
@@ -44,6 +44,33 @@ from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 import re
+from concurrent.futures import ThreadPoolExecutor
+from driver_pool import DriverPool, ensure_chromedriver
+from html_archive import SOURCE_SELENIUM, archive_page
+from page_extractor import RENDERED_XPATHS
+from ingest import CsvIngestWriter
+from columnar_store import ensure_store, load_table, store_path_for, write_partitioned
+from sql_store import (bootstrap, connect, insert_reviews, insert_snapshots, list_products,
+                       product_history, reviews_for_product)
+from normalize import parse_discount, parse_price
+from sentiment_cascade import AMBIGUOUS_BAND, cascade_model_id
+from sentiment_aggregates import daily_sentiment, label_counts
+from forecast_store import AUTO_ORDER, stored_forecast
+from arima_order import chosen_order
+from forecast_cache import cached_forecast, get_forecast_cache
+from fast_forecast import LIVE_ARIMA_MAX_POINTS, forecast_series
+from model_store import RANDOM_FOREST_PARAMS, cached_model
+
+# Reviews VADER scores inside this compound band are re-scored by the transformer
+SENTIMENT_BAND = AMBIGUOUS_BAND
+SENTIMENT_MODEL_ID = cascade_model_id(SENTIMENT_BAND)
+
+# ARIMA order for live fits of products that have no searched order yet
+DEFAULT_ARIMA_ORDER = (5, 1, 0)
+
+# Scraper pool settings
+SCRAPE_WORKERS = 4
+PAGES_PER_DRIVER = 25
 
 def extract_price(price_text):
     """Extracts and converts price from a string with currency symbols or commas."""
@@ -57,17 +84,20 @@ def get_driver():
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
 
-    # Automatically install the chromedriver version that matches the chromium version
-    chromedriver_autoinstaller.install()
+    # Automatically install the chromedriver version that matches the chromium version (once per process)
+    ensure_chromedriver()
 
     # Create the webdriver with the options and use the default path
     driver = webdriver.Chrome(options=chrome_options)
+    driver.set_window_size(1920, 1080)
     return driver
 
     
-def scrape_product_data(link):
-    driver = get_driver()
-    driver.set_window_size(1920, 1080)
+def scrape_product_data(link, driver=None):
+    # Reuse a leased driver when given one, otherwise start a throwaway browser
+    owns_driver = driver is None
+    if owns_driver:
+        driver = get_driver()
     driver.get(link)
     product_data = {
         "product_name": "",  # Add product_name to the dictionary
@@ -92,27 +122,27 @@ def scrape_product_data(link):
             driver.get(link)
             time.sleep(5)
 
+    # Keep the rendered page so extraction can be re-run offline (python html_archive.py --replay --source selenium)
     try:
-        price_elem = driver.find_element(
-            By.XPATH, '//*[@id="corePriceDisplay_desktop_feature_div"]/div[1]/span[3]/span[2]/span[2]'
-        )
+        archive_page(link, driver.page_source, source=SOURCE_SELENIUM)
+    except Exception as e:
+        print(f"Error archiving page: {e}")
+
+    try:
+        price_elem = driver.find_element(By.XPATH, RENDERED_XPATHS["selling price"])
         product_data["selling price"] = int("".join(price_elem.text.strip().split(",")))
     except Exception as e:
         print(f"Error extracting selling price: {e}")
 
     try:
-        original_price = driver.find_element(
-        By.XPATH, '//*[@id="corePriceDisplay_desktop_feature_div"]/div[2]/span/span[1]/span[2]/span/span[2]'
-        ).text
+        original_price = driver.find_element(By.XPATH, RENDERED_XPATHS["original price"]).text
         product_data["original price"] = extract_price(original_price)
     except Exception as e:
         print(f"Error extracting original price: {e}")
 
 
     try:
-        discount = driver.find_element(
-            By.XPATH, '//*[@id="corePriceDisplay_desktop_feature_div"]/div[1]/span[2]'
-        )
+        discount = driver.find_element(By.XPATH, RENDERED_XPATHS["discount"])
         full_rating_text = discount.get_attribute("innerHTML").strip()
         if " out of 5 stars" in full_rating_text.lower():
             product_data["rating"] = full_rating_text.lower().split(" out of")[0].strip()
@@ -122,7 +152,7 @@ def scrape_product_data(link):
         print(f"Error extracting discount: {e}")
 
     try:
-        rating_elem = driver.find_element(By.XPATH, '//*[@id="acrPopover"]/span[1]/a/span')
+        rating_elem = driver.find_element(By.XPATH, RENDERED_XPATHS["rating"])
         product_data["rating"] = rating_elem.text.strip()
         print("Extracted Rating:", product_data["rating"])
     except Exception as e:
@@ -130,7 +160,7 @@ def scrape_product_data(link):
     try:
         # Wait for the review element to appear
         review_elem = WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.XPATH, "//*[@id='product-summary']/p/span"))
+        EC.presence_of_element_located((By.XPATH, RENDERED_XPATHS["review"]))
         )
         product_data["review"].append(review_elem.text.strip())
         print("Extracted Review:", review_elem.text.strip())
@@ -138,55 +168,63 @@ def scrape_product_data(link):
         print(f"Error extracting AI-generated review: {e}")
 
 
-    driver.quit()
+    if owns_driver:
+        driver.quit()
     return product_data
 
-for product_name, link in links.items():
-    product_data = scrape_product_data(link)
-    
-    # Update reviews.csv
-    try:
-        reviews_df = pd.read_csv("reviews.csv")
-    except FileNotFoundError:
-        reviews_df = pd.DataFrame(columns=["product_name", "review", "rating", "date"])
-    
-    new_reviews={
-        "product_name": product_name,
-        "review": product_data["review"],
-        "rating": product_data["rating"],
-        "date": datetime.now().strftime("%Y-%m-%d")
-    }
-    
-    new_reviews_df = pd.DataFrame(new_reviews)
-    reviews_df = pd.concat([reviews_df, new_reviews_df], ignore_index=True)
-    reviews_df.to_csv("reviews.csv", index=False)
-    
-    try:
-        competitor_df = pd.read_csv("competitor_data.csv")
-
-        # Drop extra columns if they exist
-        competitor_df = competitor_df[['product_name', 'price', 'discount', 'date']]
-    except FileNotFoundError:
-        competitor_df = pd.DataFrame(columns=["product_name", "price", "discount", "date"])
-
-    # Create new data entry
-    new_data = {
-        "product_name": product_name,
-        "price": product_data["selling price"],
-        "discount": product_data["discount"],
-        "date": datetime.now().strftime("%Y-%m-%d"),
-    }
-
-    #  Convert to DataFrame and ensure column alignment
-    new_data_df = pd.DataFrame([new_data], columns=["product_name", "price", "discount", "date"])
-
-    # Append data correctly
-    competitor_df = pd.concat([competitor_df, new_data_df], ignore_index=True)
+# Scrape all links in parallel, navigating pooled drivers instead of relaunching Chrome
+with DriverPool(get_driver, size=SCRAPE_WORKERS, max_pages=PAGES_PER_DRIVER) as driver_pool:
+    def scrape_with_pool(link):
+        with driver_pool.lease() as driver:
+            return scrape_product_data(link, driver)
+
+    with ThreadPoolExecutor(max_workers=SCRAPE_WORKERS) as executor:
+        scraped = dict(zip(links.keys(), executor.map(scrape_with_pool, links.values())))
+
+# Append only the new rows in batches instead of rewriting the full history per product.
+# Each batch also lands in the Parquet store and the indexed SQLite store.
+# The stores get the CSV history first, so they never hold only the new batches.
+# Older histories name the product column "title" (and the review text "review_statements")
+REVIEW_RENAMES = {"title": "product_name", "review_statements": "review"}
+COMPETITOR_RENAMES = {"title": "product_name"}
+ensure_store("competitor_data.csv", renames=COMPETITOR_RENAMES)
+ensure_store("reviews.csv", renames=REVIEW_RENAMES)
+ingest_db = connect()
+# Seed empty tables (fresh database or schema rebuild) before the new rows make them non-empty
+bootstrap(ingest_db, lambda: load_table("competitor_data.csv"), lambda: load_table("reviews.csv"))
+with CsvIngestWriter("reviews.csv", ["product_name", "review", "rating", "date"],
+                     renames=REVIEW_RENAMES, sinks=[
+            lambda batch: write_partitioned(batch, store_path_for("reviews.csv")),
+            lambda batch: insert_reviews(ingest_db, batch),
+        ]) as reviews_writer, \
+        CsvIngestWriter("competitor_data.csv", ["product_name", "price", "discount", "date"],
+                        renames=COMPETITOR_RENAMES, sinks=[
+            lambda batch: write_partitioned(batch, store_path_for("competitor_data.csv")),
+            lambda batch: insert_snapshots(ingest_db, batch),
+        ]) as competitor_writer:
+    for product_name, link in links.items():
+        product_data = scraped[product_name]
+        scrape_date = datetime.now().strftime("%Y-%m-%d")
+
+        # One reviews.csv row per extracted review
+        for review in product_data["review"]:
+            reviews_writer.add({
+                "product_name": product_name,
+                "review": review,
+                "rating": product_data["rating"],
+                "date": scrape_date,
+            })
+
+        competitor_writer.add({
+            "product_name": product_name,
+            "price": product_data["selling price"],
+            "discount": product_data["discount"],
+            "date": scrape_date,
+        })
+
+# Forecasts and model features are refreshed offline by refresh_job.py (schedule it after each scrape,
+# see README); this app only reads them and fits live while a product's stored forecast is stale
 
-    # Save without extra columns
-    competitor_df.to_csv("competitor_data.csv", index=False)
-
-    
 # API keys
 API_KEY = ""  # Groq API Key
 SLACK_WEBHOOK = ""  # Slack webhook URL
@@ -223,27 +261,21 @@ def truncate_text(text, max_length=512):
 
 # Load competitor data
 def load_competitor_data():
-    """Load competitor data from a CSV file."""
-    data = pd.read_csv("competitor_data.csv")
+    """Load competitor data from the Parquet store (or the CSV file if no store exists)."""
+    data = load_table("competitor_data.csv")
     return data
 
 # Load reviews data
 def load_reviews_data():
-    """Load reviews data from a CSV file."""
-    reviews = pd.read_csv("reviews.csv")
+    """Load reviews data from the Parquet store (or the CSV file if no store exists)."""
+    reviews = load_table("reviews.csv")
     return reviews
 
-# Analyze customer sentiment
-def analyze_sentiment(reviews):
-    """Analyze customer sentiment for reviews."""
-    sentiment_pipeline = pipeline("sentiment-analysis")
-    return sentiment_pipeline(reviews)
-
 # Train predictive model
 def train_predictive_model(data):
     """Train a predictive model for competitor pricing strategy."""
-    data["Discount"] = data["Discount"].str.replace("%", "").astype(float)
-    data["Price"] = data["Price"].astype(float)
+    data["Discount"] = parse_discount(data["Discount"])
+    data["Price"] = parse_price(data["Price"])
     data["Predicted_Discount"] = data["Discount"] + (data["Price"] * 0.05).round(2)
 
     X = data[["Price", "Discount"]]
@@ -251,20 +283,23 @@ def train_predictive_model(data):
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-    model = RandomForestRegressor(random_state=42)
-    model.fit(X_train, y_train)
-    return model
+    # Stored per training set; a changed set is retrained on all cores in the background
+    return cached_model(
+        "scraep_discount_predictor", X_train, y_train, RANDOM_FOREST_PARAMS,
+        lambda: RandomForestRegressor(**RANDOM_FOREST_PARAMS, n_jobs=-1).fit(X_train, y_train),
+    )
 
 # Forecast discounts using ARIMA
-def forecast_discounts_arima(data, future_days=5):
+def forecast_discounts_arima(data, future_days=5, order=DEFAULT_ARIMA_ORDER):
     """
     Forecast future discounts using ARIMA.
     :param data: DataFrame containing historical discount data (with a datetime index).
     :param future_days: Number of days to forecast.
+    :param order: ARIMA (p, d, q) order.
     :return: DataFrame with historical and forecasted discounts.
     """
     data = data.sort_index()
-    data["discount"] = pd.to_numeric(data["discount"], errors="coerce")
+    data["discount"] = parse_discount(data["discount"])
     data = data.dropna(subset=["discount"])
 
     discount_series = data["discount"]
@@ -275,18 +310,30 @@ def forecast_discounts_arima(data, future_days=5):
         except Exception as e:
             raise ValueError("Index must be datetime or convertible to datetime.") from e
 
-    model = ARIMA(discount_series, order=(5, 1, 0))
-    model_fit = model.fit()
+    # Too short for ARIMA or too long to fit live: use the vectorized fast path
+    if len(discount_series) < 5 or len(discount_series) > LIVE_ARIMA_MAX_POINTS:
+        return forecast_series(discount_series, future_days)
 
-    forecast = model_fit.forecast(steps=future_days)
-    future_dates = pd.date_range(
-        start=discount_series.index[-1] + pd.Timedelta(days=1),
-        periods=future_days
-    )
+    def fit():
+        try:
+            model = ARIMA(discount_series, order=order)
+            model_fit = model.fit()
+        except Exception:
+            return forecast_series(discount_series, future_days)
+
+        forecast = model_fit.forecast(steps=future_days)
+        future_dates = pd.date_range(
+            start=discount_series.index[-1] + pd.Timedelta(days=1),
+            periods=future_days
+        )
+
+        forecast_df = pd.DataFrame({"Date": future_dates, "Predicted_Discount": forecast})
+        forecast_df.set_index("Date", inplace=True)
+        return forecast_df
 
-    forecast_df = pd.DataFrame({"Date": future_dates, "Predicted_Discount": forecast})
-    forecast_df.set_index("Date", inplace=True)
-    return forecast_df
+    # Reruns with an unchanged series reuse the cached forecast
+    product = data["product_name"].iloc[0] if "product_name" in data.columns else None
+    return cached_forecast(product, order, discount_series, future_days, fit)
 
 # Send notifications to Slack
 def send_to_slack(data):
@@ -344,36 +391,36 @@ def generate_strategy_recommendation(product_name, competitor_data, sentiment):
 
 st.sidebar.header("❄️Select a Product❄️")
 
+# Indexed store for the dashboard lookups (seeded from the history files on first run)
+store = connect()
+bootstrap(store, load_competitor_data, load_reviews_data)
+
 def get_product_list():
-    try:
-        competitor_df = pd.read_csv("competitor_data.csv")
-        return competitor_df["product_name"].drop_duplicates().tolist()
-    except FileNotFoundError:
-        return []
+    return list_products(store)
 
 products = get_product_list()
 
 selected_product = st.sidebar.selectbox("Choose a product to analyze:", products)
 
-competitor_data = load_competitor_data()
-reviews_data = load_reviews_data()
-
-product_data = competitor_data[competitor_data["product_name"] == selected_product]
-product_reviews = reviews_data[reviews_data["product_name"] == selected_product]
+product_data = product_history(store, selected_product)
+product_reviews = reviews_for_product(store, selected_product, with_text=False)
 
 st.header(f"Competitor Analysis for {selected_product}")
 st.subheader("Competitor Data")
 st.table(product_data.tail(5))
 
 if not product_reviews.empty:
-    product_reviews.loc[:, "review"] = product_reviews["review"].apply(lambda x: truncate_text(x, 1024))
-
-    reviews = product_reviews["review"].tolist()
-    sentiments = analyze_sentiment(reviews)
+    # Daily aggregates scored offline by refresh_job.py
+    daily_sentiments = daily_sentiment(store, selected_product, SENTIMENT_MODEL_ID)
+    sentiments = label_counts(daily_sentiments)
+    if daily_sentiments.empty:
+        st.info("Sentiment for this product has not been scored yet; run refresh_job.py.")
 
     st.subheader("Customer Sentiment Analysis")
-    sentiment_df = pd.DataFrame(sentiments)
-    fig = px.bar(sentiment_df, x="label", title="Sentiment Analysis Results")
+    fig = px.bar(sentiments, x="label", y="count", title="Sentiment Analysis Results")
+    st.plotly_chart(fig)
+    fig = px.line(daily_sentiments, x="date", y=["mean_score", "rolling_7d", "rolling_30d"],
+                  title="Daily Sentiment Trend")
     st.plotly_chart(fig)
 else:
     st.write("No reviews available for this product.")
@@ -381,11 +428,18 @@ else:
 product_data["date"] = pd.to_datetime(product_data["date"], errors="coerce")
 # product_data = product_data.dropna(subset=["Date"])
 product_data.index= pd.date_range(start=product_data.index.min(), periods=len(product_data), freq="D")
-product_data["discount"] = pd.to_numeric(product_data["discount"], errors="coerce")
+product_data["discount"] = parse_discount(product_data["discount"])
 product_data = product_data.dropna(subset=["discount"])
 
-# Forecasting Model
-product_data_with_predictions = forecast_discounts_arima(product_data)
+# Forecasting Model: read the precomputed forecast, fitting on the spot if none is stored or it is stale
+product_data_with_predictions = stored_forecast(store, selected_product, AUTO_ORDER, days=5)
+if product_data_with_predictions.empty:
+    product_data_with_predictions = forecast_discounts_arima(
+        product_data, order=chosen_order(store, selected_product) or DEFAULT_ARIMA_ORDER
+    )
+    forecast_stats = get_forecast_cache().stats()
+    st.caption(f"Forecast cache: {forecast_stats['hits']} hits, {forecast_stats['misses']} misses, "
+               f"{forecast_stats['entries']} entries, {forecast_stats['evictions']} evicted")
 
 st.subheader("Competitor Current and Predicted Discounts")
 st.table(product_data_with_predictions[["Predicted_Discount"]].tail(10))
@@ -394,7 +448,7 @@ st.table(product_data_with_predictions[["Predicted_Discount"]].tail(10))
 recommendations = generate_strategy_recommendation(
     selected_product,
     product_data_with_predictions,
-    sentiments if not product_reviews.empty else "No reviews available",
+    sentiments.to_dict("records") if not product_reviews.empty else "No reviews available",
 )
 st.subheader("Strategic Recommendations")
 st.write(recommendations)
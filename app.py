@@ -19,6 +19,20 @@ from statsmodels.tsa.arima.model import ARIMA
 from transformers import pipeline
 import nltk
 from nltk.sentiment import SentimentIntensityAnalyzer
+from columnar_store import load_table
+from normalize import parse_discount, parse_price
+from sentiment_cache import cached_sentiment, get_cache
+from vader_sentiment import score_vader
+from sentiment_aggregates import daily_sentiment, label_counts
+from forecast_store import AUTO_ORDER, stored_forecast
+from arima_order import chosen_order
+from forecast_cache import cached_forecast, get_forecast_cache
+from fast_forecast import LIVE_ARIMA_MAX_POINTS, METHOD_NAMES, default_method, forecast_series
+from model_store import RANDOM_FOREST_PARAMS, cached_model
+from sql_store import bootstrap, connect, latest_snapshot, list_products, product_history, reviews_for_product
+
+# ✅ ARIMA order for live fits of products that have no searched order yet
+DEFAULT_ARIMA_ORDER = (2, 1, 0)
 
 # ✅ Download the VADER lexicon (needed for sentiment analysis)
 nltk.download('vader_lexicon')
@@ -127,9 +141,9 @@ def truncate_text(text, max_length=512):
     """Truncate text to a specified maximum length."""
     return text[:max_length]
 
-def load_and_preprocess_data(file_path, drop_na_columns=None):
-    """Load and preprocess data from a CSV file."""
-    data = pd.read_csv(file_path)
+def load_and_preprocess_data(file_path, drop_na_columns=None, product=None, columns=None):
+    """Load and preprocess data from the Parquet store (or the CSV file if no store exists)."""
+    data = load_table(file_path, product=product, columns=columns)
     if drop_na_columns:
         data = data.dropna(subset=drop_na_columns)  # Drop rows with missing values in specified columns
     return data
@@ -139,23 +153,13 @@ def analyze_sentiment(reviews):
     if not reviews:  # If reviews is empty, return a message
         return "No reviews available"
     """Perform sentiment analysis using Vader."""
-    analyzer = SentimentIntensityAnalyzer()
-    
     # Ensure reviews is a list and not empty
     if not isinstance(reviews, list) or len(reviews) == 0:
         return "No reviews available"
 
-    sentiment_results = []
-    for review in reviews:
-        score = analyzer.polarity_scores(review)  # Get sentiment scores
-        if score['compound'] >= 0.05:
-            sentiment_results.append("Positive")
-        elif score['compound'] <= -0.05:
-            sentiment_results.append("Negative")
-        else:
-            sentiment_results.append("Neutral")
-
-    return sentiment_results
+    # ✅ Only reviews not already in the persistent cache are scored, in one batch with a shared analyzer
+    sentiment_results, _ = cached_sentiment(reviews, "vader", score_vader)
+    return sentiment_results.tolist()
 
 def train_predictive_model(data):
     """Train a predictive model to estimate competitor discount strategies."""
@@ -165,8 +169,8 @@ def train_predictive_model(data):
         return None, None  # Prevents crash
 
     # ✅ Convert discount & price to numeric safely
-    data["discount"] = pd.to_numeric(data["discount"].str.replace("%", "", regex=True), errors="coerce").fillna(0)
-    data["price"] = pd.to_numeric(data["price"], errors="coerce").fillna(0).astype(int)
+    data["discount"] = parse_discount(data["discount"]).fillna(0)
+    data["price"] = parse_price(data["price"]).fillna(0).astype(int)
 
     # ✅ Ensure required columns exist
     required_cols = ["price", "discount"]
@@ -182,16 +186,18 @@ def train_predictive_model(data):
     # ✅ Split data into training and testing sets
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-    # ✅ Train a Random Forest Regressor
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
-    model.fit(X_train, y_train)
+    # ✅ Reuse the stored Random Forest for this training data; retrain on all cores when it changes
+    model = cached_model(
+        "app_discount_predictor", X_train, y_train, RANDOM_FOREST_PARAMS,
+        lambda: RandomForestRegressor(**RANDOM_FOREST_PARAMS, n_jobs=-1).fit(X_train, y_train),
+    )
 
     # ✅ Make predictions
     data["Predicted_Discount"] = model.predict(X)  # Store predictions in DataFrame
     return model, data  # Return both model and predictions
 
 
-def forecast_discounts_arima(data, future_days=5):
+def forecast_discounts_arima(data, future_days=5, order=DEFAULT_ARIMA_ORDER):
     """Forecast future discount values using ARIMA model."""
     
     # ✅ Check if data is empty
@@ -203,37 +209,43 @@ def forecast_discounts_arima(data, future_days=5):
     data = data.sort_index()
 
     # ✅ Convert discount column to numeric, handling errors
-    data["discount"] = pd.to_numeric(data["discount"], errors="coerce")
+    data["discount"] = parse_discount(data["discount"])
 
     # ✅ Drop missing discount values
     discount_series = data["discount"].dropna()
 
-    # ✅ Check if enough data exists for forecasting
-    if len(discount_series) < 5:
-        st.warning("⚠ Warning: Not enough historical data for ARIMA forecasting.")
-        return pd.DataFrame(columns=["Date", "Predicted_Discount"]).set_index("Date")
+    # ✅ Too short for ARIMA, or too long to fit live: use the vectorized fast path
+    if len(discount_series) < 5 or len(discount_series) > LIVE_ARIMA_MAX_POINTS:
+        method = default_method(discount_series)
+        st.caption(f"ℹ Using a fast {METHOD_NAMES[method]} forecast instead of ARIMA for this series length.")
+        return forecast_series(discount_series, future_days, method)
 
     # ✅ Convert index to datetime if not already
     if not isinstance(data.index, pd.DatetimeIndex):
         data.index = pd.to_datetime(data.index)
 
-    # ✅ Fit ARIMA model
-    try:
-        model = ARIMA(discount_series, order=(2, 1, 0))  # Order can be tuned
-        model_fit = model.fit()
-    except Exception as e:
-        st.error(f"⚠ Error fitting ARIMA model: {e}")
-        return pd.DataFrame(columns=["Date", "Predicted_Discount"]).set_index("Date")
-
-    # ✅ Forecast future values
-    forecast = model_fit.forecast(steps=future_days)
-    future_dates = pd.date_range(start=discount_series.index[-1] + pd.Timedelta(days=1), periods=future_days)
-
-    # ✅ Create a DataFrame for forecasted values
-    forecast_df = pd.DataFrame({"Date": future_dates, "Predicted_Discount": forecast})
-    forecast_df.set_index("Date", inplace=True)
-
-    return forecast_df
+    def fit():
+        # ✅ Fit ARIMA model
+        try:
+            model = ARIMA(discount_series, order=order)  # ✅ Searched per product by arima_order.py
+            model_fit = model.fit()
+        except Exception as e:
+            method = default_method(discount_series)
+            st.warning(f"⚠ ARIMA fit failed ({e}); showing a fast {METHOD_NAMES[method]} forecast instead.")
+            return forecast_series(discount_series, future_days, method)
+
+        # ✅ Forecast future values
+        forecast = model_fit.forecast(steps=future_days)
+        future_dates = pd.date_range(start=discount_series.index[-1] + pd.Timedelta(days=1), periods=future_days)
+
+        # ✅ Create a DataFrame for forecasted values
+        forecast_df = pd.DataFrame({"Date": future_dates, "Predicted_Discount": forecast})
+        forecast_df.set_index("Date", inplace=True)
+        return forecast_df
+
+    # ✅ Reruns with an unchanged series reuse the cached forecast
+    product = data["title"].iloc[0] if "title" in data.columns else None
+    return cached_forecast(product, order, discount_series, future_days, fit)
 
 def send_to_slack(data):
     """Send generated data to a Slack channel with error handling."""
@@ -369,20 +381,19 @@ else:
 st.title("E-Commerce Competitor Dashboard")
 st.sidebar.header("Select a Product")
 
-# ✅ Load competitor data with error handling
+# ✅ Open the indexed store (seeded from the history files on first run)
+store = connect()
 try:
-    competitor_data = load_and_preprocess_data("competitor_data.csv", drop_na_columns=["date", "discount"])
-
-    if competitor_data.empty or "title" not in competitor_data.columns:
-        st.error("⚠️ Competitor data is empty or missing the 'title' column.")
-        products = []
-    else:
-        products = competitor_data["title"].dropna().unique().tolist()
-
+    bootstrap(
+        store,
+        lambda: load_and_preprocess_data("competitor_data.csv"),
+        lambda: load_and_preprocess_data("reviews.csv"),
+    )
 except FileNotFoundError:
-    st.error("⚠️ File 'competitor_data.csv' not found. Please upload the correct file.")
-    competitor_data = pd.DataFrame()
-    products = []
+    st.error("⚠️ File 'competitor_data.csv' or 'reviews.csv' not found. Please upload the correct file.")
+
+# ✅ Product list comes from the (product, date) index instead of a full-table scan
+products = list_products(store)
 
 # ✅ Sidebar: Handle case when no products are available
 if not products:
@@ -393,7 +404,7 @@ else:
 
 # ✅ Ensure `selected_product` is valid before filtering
 if selected_product:
-    competitor_data_filtered = competitor_data[competitor_data["title"] == selected_product]
+    competitor_data_filtered = product_history(store, selected_product, product_col="title").dropna(subset=["date", "discount"])
 else:
     competitor_data_filtered = pd.DataFrame()
 
@@ -402,17 +413,15 @@ st.write("Debug: Competitor Data Before Forecasting", competitor_data_filtered)
 if competitor_data_filtered.empty and selected_product:
     st.error(f"⚠️ No competitor data available for '{selected_product}'! Please check data loading.")
 
-st.write("Competitor CSV Preview:", competitor_data.head())  # Debug competitor data
+st.write("Competitor CSV Preview:", latest_snapshot(store, product_col="title").head())  # Debug competitor data
 
-# ✅ Load reviews data safely
-try:
-    reviews_data = load_and_preprocess_data("reviews.csv")
-    if reviews_data.empty or "title" not in reviews_data.columns:
-        st.warning("⚠️ Reviews data is empty or missing 'title' column.")
-        reviews_data = pd.DataFrame()  # Set as empty to prevent further errors
-except FileNotFoundError:
-    st.error("⚠️ File 'reviews.csv' not found. Please upload the correct file.")
-    reviews_data = pd.DataFrame()
+# ✅ Load the selected product's reviews with an indexed lookup
+reviews_data = pd.DataFrame()
+if selected_product:
+    reviews_data = reviews_for_product(store, selected_product, product_col="title")
+    reviews_data = reviews_data.rename(columns={"review": "review_statements"})
+    if reviews_data.empty:
+        st.warning("⚠️ Reviews data is empty for the selected product.")
 
 # ✅ Display competitor analysis only if product is selected
 if selected_product:
@@ -445,6 +454,9 @@ st.write(f"Debug: Extracted {len(reviews)} reviews for sentiment analysis")
 # ✅ Perform Sentiment Analysis
 if reviews:
     sentiments = analyze_sentiment(reviews)
+    cache_stats = get_cache().stats()
+    st.caption(f"Sentiment cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+               f"({cache_stats['hit_rate']:.0%} hit rate, {cache_stats['entries']} entries)")
     st.write(f"✅ Successfully analyzed {len(reviews)} reviews.")
 else:
     sentiments = None
@@ -463,6 +475,13 @@ else:
 # ✅ Debugging Step
 st.write("Debug: Sentiment DataFrame Structure", sentiment_df)
 
+# ✅ Daily sentiment aggregates (scored offline by refresh_job.py)
+daily_sentiments = pd.DataFrame()
+sentiment_counts = pd.DataFrame(columns=["label", "count"])
+if selected_product:
+    daily_sentiments = daily_sentiment(store, selected_product, "vader")
+    sentiment_counts = label_counts(daily_sentiments)
+
 
 # ✅ Load competitor data with improved error handling
 competitor_path = "competitor_data.csv"
@@ -520,9 +539,12 @@ else:
 # ✅ Sentiment Analysis Visualization
 st.subheader("📊 Sentiment Analysis Results")
 
-if not sentiment_df.empty and {'label', 'count'}.issubset(sentiment_df.columns):
-    if sentiment_df['count'].sum() > 0:  # Ensure there's data to display
-        fig = px.bar(sentiment_df, x="label", y="count", title="Sentiment Analysis Results")
+if not sentiment_counts.empty:
+    if sentiment_counts['count'].sum() > 0:  # Ensure there's data to display
+        fig = px.bar(sentiment_counts, x="label", y="count", title="Sentiment Analysis Results")
+        st.plotly_chart(fig)
+        fig = px.line(daily_sentiments, x="date", y=["mean_score", "rolling_7d", "rolling_30d"],
+                      title="Daily Sentiment Trend")
         st.plotly_chart(fig)
     else:
         st.warning("⚠️ No sentiment data to display.")
@@ -618,15 +640,9 @@ st.write(recommendations)
 # ✅ Streamlit code to render sentiment analysis
 st.subheader("Customer Sentiment Analysis")
 
-# ✅ Ensure DataFrame creation is safe
-if isinstance(sentiments, list) and sentiments:
-    sentiment_df = pd.DataFrame(sentiments)  # Convert to DataFrame safely
-else:
-    sentiment_df = pd.DataFrame(columns=["label", "count"])  # Prevent crash
-
-# ✅ Check if DataFrame is valid before plotting
-if not sentiment_df.empty and 'label' in sentiment_df.columns and 'count' in sentiment_df.columns:
-    fig = px.bar(sentiment_df, x="label", y="count", title="Sentiment Analysis Results")
+# ✅ Read the label counts straight from the daily aggregates
+if not sentiment_counts.empty and sentiment_counts['count'].sum() > 0:
+    fig = px.bar(sentiment_counts, x="label", y="count", title="Sentiment Analysis Results")
     st.plotly_chart(fig)
 else:
     st.write("⚠️ No reviews available for this product.")
@@ -643,8 +659,16 @@ if competitor_data_filtered.empty:
     competitor_data_with_predictions = pd.DataFrame()  # Prevent crash
 else:
     try:
-        competitor_data_with_predictions = forecast_discounts_arima(competitor_data_filtered)
+        # ✅ Read the forecast precomputed by refresh_job.py; fit here if none is stored or it is stale
+        competitor_data_with_predictions = stored_forecast(store, selected_product, AUTO_ORDER, days=5)
+        if competitor_data_with_predictions.empty:
+            competitor_data_with_predictions = forecast_discounts_arima(
+                competitor_data_filtered, order=chosen_order(store, selected_product) or DEFAULT_ARIMA_ORDER
+            )
         st.write("Debug: ARIMA Predictions", competitor_data_with_predictions)
+        forecast_stats = get_forecast_cache().stats()
+        st.caption(f"Forecast cache: {forecast_stats['hits']} hits, {forecast_stats['misses']} misses, "
+                   f"{forecast_stats['entries']} entries, {forecast_stats['evictions']} evicted")
     except Exception as e:
         st.error(f"⚠️ Error in ARIMA Forecasting: {str(e)}")
         competitor_data_with_predictions = pd.DataFrame()  # Prevent crash
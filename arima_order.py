@@ -0,0 +1,166 @@
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from itertools import product as grid
+
+import numpy as np
+
+# Candidate (p, d, q) terms searched per product
+P_VALUES = range(0, 6)
+D_VALUES = range(0, 3)
+Q_VALUES = range(0, 3)
+# First-round grid; the rest is only searched when the best order sits on its edge
+FIRST_ROUND_P = 2
+FIRST_ROUND_Q = 1
+# Keep at least this many observations per estimated parameter
+OBSERVATIONS_PER_PARAMETER = 3
+# Stored orders older than this are searched again
+RESEARCH_DAYS = 7
+STATIONARITY_PVALUE = 0.05
+# Used for products where no candidate converged
+FALLBACK_ORDER = (1, 1, 0)
+
+
+def order_key(order):
+    if isinstance(order, str):  # e.g. AUTO_ORDER
+        return order
+    return ",".join(str(term) for term in order)
+
+
+def parse_order(key):
+    return tuple(int(term) for term in key.split(","))
+
+
+def differencing_order(series, max_d=max(D_VALUES)):
+    """Smallest d whose differenced series passes the ADF unit-root test."""
+    from statsmodels.tsa.stattools import adfuller
+
+    values = np.asarray(series, dtype="float64")
+    for d in range(max_d + 1):
+        diffed = np.diff(values, n=d) if d else values
+        if len(diffed) < 8 or np.std(diffed) == 0:
+            return d
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                pvalue = adfuller(diffed, autolag="AIC")[1]
+        except (ValueError, np.linalg.LinAlgError):
+            return d
+        if pvalue < STATIONARITY_PVALUE:
+            return d
+    return max_d
+
+
+def candidate_orders(series):
+    """
+    The grid pruned before any fit: d is fixed by a unit-root test, and
+    orders with too many parameters for the series length are dropped.
+    """
+    d = differencing_order(series)
+    budget = max((len(series) - d) // OBSERVATIONS_PER_PARAMETER, 1)
+    return [(p, d, q) for p, q in grid(P_VALUES, Q_VALUES) if p + q + 1 <= budget]
+
+
+def _fit_aic(key, series, order):
+    # Runs in a worker; unusable fits come back as None and drop out
+    from statsmodels.tsa.arima.model import ARIMA
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            fit = ARIMA(series, order=order).fit()
+        converged = fit.mle_retvals.get("converged", True) if fit.mle_retvals else True
+        aic = fit.aic if converged and np.isfinite(fit.aic) else None
+    except Exception:
+        aic = None
+    return key, order, aic
+
+
+def _on_first_round_edge(order):
+    return order[0] == FIRST_ROUND_P or order[2] == FIRST_ROUND_Q
+
+
+def search_orders(series_by_product, workers=None, pool=None):
+    """
+    Pick the lowest-AIC order for every product, fitting candidates of all
+    products together in one process pool.
+
+    The small orders are fitted first; larger p and q are only tried for
+    products whose best first-round order sits on the edge of that grid.
+    Returns {product: (order, aic)}; products where no candidate converges
+    are left out.
+    """
+    candidates = {key: candidate_orders(series) for key, series in series_by_product.items()}
+    owns_pool = pool is None
+    pool = pool or ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+    best = {}
+
+    def run(tasks):
+        for future in [pool.submit(_fit_aic, key, series_by_product[key], order) for key, order in tasks]:
+            key, order, aic = future.result()
+            if aic is not None and (key not in best or aic < best[key][1]):
+                best[key] = (order, aic)
+
+    try:
+        run([(key, order) for key, orders in candidates.items() for order in orders
+             if order[0] <= FIRST_ROUND_P and order[2] <= FIRST_ROUND_Q])
+        run([(key, order) for key, orders in candidates.items() for order in orders
+             if (order[0] > FIRST_ROUND_P or order[2] > FIRST_ROUND_Q)
+             and (key not in best or _on_first_round_edge(best[key][0]))])
+    finally:
+        if owns_pool:
+            pool.shutdown()
+    return best
+
+
+def stored_orders(conn, max_age_days=RESEARCH_DAYS):
+    """{product: order} for orders searched within max_age_days."""
+    cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat(timespec="seconds")
+    rows = conn.execute("SELECT product_name, arima_order FROM arima_orders WHERE searched_at >= ?", [cutoff])
+    return {product: parse_order(key) for product, key in rows}
+
+
+def chosen_order(conn, product):
+    """The persisted order of one product, however old (None before the first search)."""
+    row = conn.execute("SELECT arima_order FROM arima_orders WHERE product_name = ?", [product]).fetchone()
+    return parse_order(row[0]) if row else None
+
+
+def save_orders(conn, best, series_by_product):
+    searched_at = datetime.now().isoformat(timespec="seconds")
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO arima_orders VALUES (?, ?, ?, ?, ?)",
+            [(product, order_key(order), aic, len(series_by_product[product]), searched_at)
+             for product, (order, aic) in best.items()],
+        )
+
+
+def refresh_orders(conn, series_by_product, workers=None, max_age_days=RESEARCH_DAYS, pool=None):
+    """
+    Return an order for every product, searching only products whose stored
+    order is missing or older than max_age_days.
+    """
+    orders = stored_orders(conn, max_age_days)
+    stale = {product: series for product, series in series_by_product.items() if product not in orders}
+    if stale:
+        start = time.perf_counter()
+        best = search_orders(stale, workers, pool)
+        save_orders(conn, best, stale)
+        orders.update({product: order for product, (order, _) in best.items()})
+        print(f"Searched ARIMA orders for {len(stale)} products in {time.perf_counter() - start:.1f}s")
+    return {product: orders[product] for product in series_by_product if product in orders}
+
+
+if __name__ == "__main__":
+    # Usage: python arima_order.py  (re-searches every product now)
+    from forecast_store import MIN_OBSERVATIONS, load_series
+    from sql_store import connect
+
+    conn = connect()
+    series_by_product = {product: series for product, series in load_series(conn).items()
+                         if len(series) >= MIN_OBSERVATIONS}
+    for product, order in sorted(refresh_orders(conn, series_by_product, max_age_days=0).items()):
+        print(f"{product}: {order}")
@@ -0,0 +1,103 @@
+import hashlib
+import os
+import pickle
+import warnings
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from arima_order import order_key
+from forecast_cache import series_fingerprint
+
+STATE_DIR = "arima_state"
+# Full re-estimation at least this often, even without drift
+REFIT_DAYS = 7
+# Mean absolute one-step error on the new days, in residual standard deviations
+DRIFT_THRESHOLD = 2.0
+
+
+def state_path(product, state_dir=STATE_DIR):
+    return os.path.join(state_dir, hashlib.sha1(product.encode("utf-8")).hexdigest()[:16] + ".pkl")
+
+
+def _fit(series, order):
+    from statsmodels.tsa.arima.model import ARIMA
+
+    with warnings.catch_warnings():
+        # Short scraped series routinely trigger convergence and frequency warnings
+        warnings.simplefilter("ignore")
+        return ARIMA(series, order=order).fit()
+
+
+def _drifted(results, threshold):
+    """True when the filtered one-step errors on the new days are unusually large."""
+    sigma = np.sqrt(results.params["sigma2"]) if "sigma2" in results.params.index else np.nan
+    if not np.isfinite(sigma) or sigma == 0:
+        return False
+    return float(np.mean(np.abs(results.resid))) / sigma > threshold
+
+
+def advance(product, series, order, state, state_dir=STATE_DIR, refit_days=REFIT_DAYS,
+            drift_threshold=DRIFT_THRESHOLD):
+    """
+    Bring a product's ARIMA state up to the end of `series`.
+
+    With a usable previous state only the new days are run through the
+    Kalman filter (params unchanged), so the cost follows the new data.
+    A full fit happens when there is no state, the order changed, history
+    before the last filtered day was rewritten, the last fit is older than
+    refit_days, or the new days drift. Returns (results, state, mode) where
+    mode is "refit", "extend" or "reuse".
+    """
+    path = state_path(product, state_dir)
+    last_observed = series.index[-1]
+    results = None
+    mode = "refit"
+    if state is not None and os.path.exists(path) and state["arima_order"] == order_key(order) \
+            and datetime.fromisoformat(state["fitted_at"]) >= datetime.now() - timedelta(days=refit_days):
+        previous_end = pd.Timestamp(state["last_observed"])
+        if series_fingerprint(series[series.index <= previous_end]) == state["fingerprint"]:
+            with open(path, "rb") as f:
+                results = pickle.load(f)
+            new = series[series.index > previous_end]
+            if new.empty:
+                mode = "reuse"
+            else:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    results = results.extend(new)
+                mode = "extend"
+                if _drifted(results, drift_threshold):
+                    results, mode = None, "refit"
+    if mode == "refit":
+        results = _fit(series, order)
+
+    if mode != "reuse":
+        os.makedirs(state_dir, exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(results, f)
+        os.replace(path + ".tmp", path)
+    state = {
+        "product_name": product,
+        "arima_order": order_key(order),
+        "last_observed": last_observed.strftime("%Y-%m-%d"),
+        "fingerprint": series_fingerprint(series),
+        "fitted_at": state["fitted_at"] if mode != "refit" else datetime.now().isoformat(timespec="seconds"),
+    }
+    return results, state, mode
+
+
+def load_states(conn):
+    rows = conn.execute("SELECT product_name, arima_order, last_observed, fingerprint, fitted_at FROM arima_state")
+    columns = ["product_name", "arima_order", "last_observed", "fingerprint", "fitted_at"]
+    return {row[0]: dict(zip(columns, row)) for row in rows}
+
+
+def save_states(conn, states):
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO arima_state VALUES (:product_name, :arima_order, :last_observed, "
+            ":fingerprint, :fitted_at)",
+            states,
+        )
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import aiohttp
+from bs4 import BeautifulSoup
+
+from html_archive import archive_page
+
+
+# Default limits for the async fetch engine
+MAX_CONNECTIONS_PER_HOST = 8
+REQUEST_TIMEOUT = 10
+
+
+# Function to parse raw page content (same parser as fetch_page_content)
+def parse_page(content):
+    return BeautifulSoup(content, "html.parser")
+
+
+# Function to fetch one page on a shared session
+async def fetch_page_content_async(session, url, parse=parse_page, archive_dir=None):
+    try:
+        async with session.get(url) as response:
+            response.raise_for_status()
+            content = await response.read()
+        if archive_dir:
+            # Compression and file I/O run off the event loop; a failed write only loses the capture
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, partial(archive_page, url, content, archive_dir=archive_dir)
+                )
+            except OSError as e:
+                print(f"Error archiving URL {url}: {e}")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Error fetching URL {url}: {e}")
+        return None
+    # A page the parser cannot handle fails only its own URL, not the whole gather
+    try:
+        return parse(content)
+    except Exception as e:
+        print(f"Error parsing URL {url}: {e}")
+        return None
+
+
+async def fetch_pages_async(urls, headers, max_per_host=MAX_CONNECTIONS_PER_HOST,
+                            timeout=REQUEST_TIMEOUT, parse=parse_page, archive_dir=None):
+    """Fetch all urls concurrently over one pooled keep-alive client."""
+    connector = aiohttp.TCPConnector(limit=0, limit_per_host=max_per_host, ttl_dns_cache=300)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(headers=headers, connector=connector, timeout=client_timeout) as session:
+        tasks = [fetch_page_content_async(session, url, parse, archive_dir) for url in urls]
+        return await asyncio.gather(*tasks)
+
+
+def fetch_pages(urls, headers, max_per_host=MAX_CONNECTIONS_PER_HOST,
+                timeout=REQUEST_TIMEOUT, parse=parse_page, archive_dir=None):
+    """
+    Drop-in batch alternative to fetch_page_content.
+    Returns one parsed page (or None on failure) per url, in the same order.
+    Raw pages are also stored in archive_dir when given (see html_archive.py).
+    """
+    coro = fetch_pages_async(list(urls), headers, max_per_host, timeout, parse, archive_dir)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # Notebooks (Colab/Jupyter) already run an event loop, so use a helper thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+# Benchmark against the serial requests.get loop using a local stub server
+def run_benchmark(n_pages=100, latency=0.05, max_per_host=MAX_CONNECTIONS_PER_HOST):
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    import requests
+
+    page = (
+        b"<html><body>"
+        b'<span class="a-size-medium a-color-base a-text-normal">Stub Product</span>'
+        b'<span class="a-price-whole">1,999</span>'
+        b'<span class="a-icon-alt">4.1 out of 5 stars</span>'
+        b"</body></html>"
+    )
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{server.server_port}/dp/{i}" for i in range(n_pages)]
+    headers = {"User-Agent": "benchmark"}
+
+    try:
+        start = time.perf_counter()
+        serial = []
+        for url in urls:
+            response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+            serial.append(parse_page(response.content))
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pooled = fetch_pages(urls, headers, max_per_host=max_per_host)
+        async_time = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    assert [s.get_text() for s in serial] == [p.get_text() for p in pooled]
+    print(f"Pages: {n_pages}, simulated latency: {latency * 1000:.0f} ms")
+    print(f"Serial requests.get: {serial_time:.2f}s")
+    print(f"Async pooled (max {max_per_host}/host): {async_time:.2f}s")
+    print(f"Speedup: {serial_time / async_time:.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
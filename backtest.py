@@ -0,0 +1,154 @@
+import argparse
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from fast_forecast import METHODS, forecast_matrix
+
+HORIZON = 7
+FOLDS = 4
+# Shortest training window a fold may use
+MIN_TRAIN = 14
+# The default orders of app.py, SCRAEP.py and APP.py
+DASHBOARD_ORDERS = [(2, 1, 0), (5, 1, 0), (1, 0, 0)]
+RESULT_COLUMNS = ["product_name", "model", "origin", "n_train", "fit_seconds", "predict_seconds",
+                  "mae", "mape", "error"]
+
+
+def _fit_arima(train, horizon, order):
+    from statsmodels.tsa.arima.model import ARIMA
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return ARIMA(train, order=order).fit()
+
+
+def _predict_arima(model_fit, horizon):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return np.asarray(model_fit.forecast(steps=horizon))
+
+
+def _fit_fast(train, horizon, method):
+    # The closed-form methods fit and forecast in one pass; predict only slices
+    return forecast_matrix(np.asarray(train, dtype="float64")[None, :], method, horizon)[0][0]
+
+
+def _predict_fast(forecast, horizon):
+    return forecast[:horizon]
+
+
+def arima_model(order):
+    return partial(_fit_arima, order=tuple(order)), _predict_arima
+
+
+def fast_model(method):
+    return partial(_fit_fast, method=method), _predict_fast
+
+
+def default_models():
+    """{name: (fit(train, horizon), predict(fitted, horizon))} for the dashboards' orders and the fast methods."""
+    models = {f"ARIMA{order}": arima_model(order) for order in DASHBOARD_ORDERS}
+    models.update({method: fast_model(method) for method in METHODS})
+    return models
+
+
+def origins(n_observations, horizon=HORIZON, folds=FOLDS, step=None, min_train=MIN_TRAIN):
+    """Training-window ends, oldest first; each fold forecasts the `horizon` days after its origin."""
+    step = step or horizon
+    ends = [n_observations - horizon - k * step for k in range(folds)]
+    return sorted(end for end in ends if end >= min_train)
+
+
+def error_metrics(actual, predicted):
+    """(MAE, MAPE %); MAPE skips zero actuals and is NaN when all are zero."""
+    actual = np.asarray(actual, dtype="float64")
+    errors = np.abs(actual - np.asarray(predicted, dtype="float64"))
+    nonzero = actual != 0
+    mape = float(np.mean(errors[nonzero] / np.abs(actual[nonzero])) * 100) if nonzero.any() else np.nan
+    return float(np.mean(errors)), mape
+
+
+def backtest_product(product, series, models, horizon=HORIZON, folds=FOLDS, step=None, min_train=MIN_TRAIN):
+    """Rolling-origin evaluation of every model on one series. Runs in a worker process."""
+    rows = []
+    for origin in origins(len(series), horizon, folds, step, min_train):
+        train, test = series.iloc[:origin], series.iloc[origin:origin + horizon]
+        for name, (fit, predict) in models.items():
+            row = {"product_name": product, "model": name, "origin": series.index[origin - 1],
+                   "n_train": origin, "fit_seconds": np.nan, "predict_seconds": np.nan,
+                   "mae": np.nan, "mape": np.nan, "error": None}
+            try:
+                start = time.perf_counter()
+                fitted = fit(train, horizon)
+                row["fit_seconds"] = time.perf_counter() - start
+                start = time.perf_counter()
+                predicted = predict(fitted, horizon)
+                row["predict_seconds"] = time.perf_counter() - start
+                row["mae"], row["mape"] = error_metrics(test, predicted)
+            except Exception as e:
+                row["error"] = str(e)
+            rows.append(row)
+    return rows
+
+
+def run_backtest(series_by_product, models=None, horizon=HORIZON, folds=FOLDS, step=None,
+                 min_train=MIN_TRAIN, workers=None):
+    """Backtest every product in a process pool. Returns one row per product, model and fold."""
+    models = models or default_models()
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = [pool.submit(backtest_product, product, series, models, horizon, folds, step, min_train)
+                   for product, series in series_by_product.items()]
+        for future in futures:
+            rows.extend(future.result())
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def comparison_report(results):
+    """Per-model accuracy and cost, best MAE first."""
+    ok = results[results["error"].isna()]
+    report = ok.groupby("model").agg(
+        products=("product_name", "nunique"),
+        folds=("origin", "size"),
+        mae=("mae", "mean"),
+        mape=("mape", "mean"),
+        fit_ms=("fit_seconds", lambda s: s.mean() * 1000),
+        predict_ms=("predict_seconds", lambda s: s.mean() * 1000),
+        total_seconds=("fit_seconds", "sum"),
+    )
+    report["total_seconds"] += ok.groupby("model")["predict_seconds"].sum()
+    report["failed"] = results[results["error"].notna()].groupby("model").size()
+    report["failed"] = report["failed"].reindex(report.index).fillna(0).astype(int)
+    return report.sort_values("mae")
+
+
+if __name__ == "__main__":
+    from arima_order import parse_order
+    from sql_store import connect
+    from forecast_store import load_series
+
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the discount forecasters.")
+    parser.add_argument("--horizon", type=int, default=HORIZON, help="Days forecast from each origin.")
+    parser.add_argument("--folds", type=int, default=FOLDS, help="Origins per product.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores).")
+    parser.add_argument("--orders", nargs="*", default=None,
+                        help="ARIMA orders to compare as p,d,q (default: the dashboards' orders).")
+    parser.add_argument("--output", default=None, help="Also write the per-fold results to this CSV.")
+    args = parser.parse_args()
+
+    models = default_models()
+    if args.orders is not None:
+        models = {name: model for name, model in models.items() if not name.startswith("ARIMA")}
+        models.update({f"ARIMA{parse_order(key)}": arima_model(parse_order(key)) for key in args.orders})
+    start = time.perf_counter()
+    results = run_backtest(load_series(connect()), models, args.horizon, args.folds, workers=args.workers)
+    if args.output:
+        results.to_csv(args.output, index=False)
+    print(f"Backtested {results['product_name'].nunique()} products in {time.perf_counter() - start:.1f}s")
+    print(comparison_report(results).round(3).to_string())
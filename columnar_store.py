@@ -0,0 +1,184 @@
+import glob
+import hashlib
+import os
+import shutil
+import sys
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from normalize import normalize_scraped
+
+
+STORE_DIR = "store"
+PARTITION_SCHEMA = pa.schema([("date", pa.string()), ("product_key", pa.string())])
+PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+# Written once a store holds its CSV's full history; the "_" prefix keeps it out of dataset scans
+IMPORTED_MARKER = "_history_imported"
+# The dataset's current column schema; it grows when a batch brings new columns
+SCHEMA_FILE = "_schema"
+
+
+# Function to pick the product column (app.py uses "title", SCRAEP.py/APP.py use "product_name")
+def product_column(columns):
+    return "product_name" if "product_name" in columns else "title"
+
+
+# Function to map a product name to a filesystem-safe partition key
+def product_key(name):
+    return hashlib.sha1(str(name).encode("utf-8")).hexdigest()[:16]
+
+
+def store_path_for(csv_path, store_dir=STORE_DIR):
+    """Location of the Parquet dataset that mirrors a CSV file (competitor_data.csv -> store/competitor_data)."""
+    return os.path.join(store_dir, os.path.splitext(os.path.basename(csv_path))[0])
+
+
+def _existing_schema(root):
+    path = os.path.join(root, SCHEMA_FILE)
+    if os.path.exists(path):
+        return pq.read_schema(path)
+    # Stores written before the schema file take the schema of their first part
+    files = glob.glob(os.path.join(root, "**", "*.parquet"), recursive=True)
+    return pq.read_schema(files[0]).remove_metadata() if files else None
+
+
+def _save_schema(root, schema):
+    os.makedirs(root, exist_ok=True)
+    tmp_path = os.path.join(root, f"{SCHEMA_FILE}.{uuid.uuid4().hex}.tmp")
+    pq.write_table(schema.empty_table(), tmp_path)
+    os.replace(tmp_path, os.path.join(root, SCHEMA_FILE))
+
+
+def _column_field(frame, name):
+    """Nullable Arrow field for a new column; an all-empty column is stored as string."""
+    field = pa.Table.from_pandas(frame[[name]], preserve_index=False).schema.field(name)
+    return pa.field(name, pa.string()) if pa.types.is_null(field.type) else field.with_nullable(True)
+
+
+def write_partitioned(df, root):
+    """Append rows to a Parquet dataset partitioned by date and product (typed at ingest)."""
+    if df.empty:
+        return
+    # One product column for every batch (app.py's CSVs say "title", SCRAEP.py writes "product_name")
+    if "product_name" not in df.columns:
+        df = df.rename(columns={"title": "product_name"})
+    df = normalize_scraped(df)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.strftime("%Y-%m-%d").fillna("unknown")
+    df["product_key"] = df[product_column(df.columns)].map(product_key)
+    df = df.sort_values(["date", "product_key"])
+
+    # The first write fixes the column types; later batches are cast to them, and
+    # columns the store has not seen yet are added (empty in the older parts)
+    schema = _existing_schema(root)
+    if schema is None:
+        data_columns = [col for col in df.columns if col not in PARTITION_SCHEMA.names]
+        frame = df[data_columns]
+        table = pa.Table.from_pandas(frame, preserve_index=False).replace_schema_metadata(None)
+        _save_schema(root, table.schema)
+    else:
+        added = [col for col in df.columns if col not in schema.names + PARTITION_SCHEMA.names]
+        if added:
+            for name in added:
+                schema = schema.append(_column_field(df, name))
+            _save_schema(root, schema)
+            print(f"Added columns to the {root} schema: {added}")
+        frame = df.reindex(columns=schema.names)
+        for field in schema:
+            if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+                frame[field.name] = frame[field.name].astype("string")
+            elif pa.types.is_integer(field.type) or pa.types.is_floating(field.type):
+                frame[field.name] = pd.to_numeric(frame[field.name], errors="coerce")
+        table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+    for name in PARTITION_SCHEMA.names:
+        table = table.append_column(name, pa.array(df[name].tolist(), type=pa.string()))
+
+    ds.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def read_partitioned(root, product=None, start=None, end=None, columns=None):
+    """
+    Read a partitioned dataset with column projection and partition pruning.
+    Only the files for the requested product and date range are opened.
+    """
+    schema = _existing_schema(root)
+    # The full schema reads parts written before a column was added (missing values come back empty)
+    dataset = ds.dataset(root, format="parquet", partitioning=PARTITIONING,
+                         schema=pa.unify_schemas([schema, PARTITION_SCHEMA]) if schema is not None else None)
+    condition = None
+    if product is not None:
+        condition = ds.field("product_key") == product_key(product)
+    if start is not None:
+        expr = ds.field("date") >= pd.Timestamp(start).strftime("%Y-%m-%d")
+        condition = expr if condition is None else condition & expr
+    if end is not None:
+        expr = ds.field("date") <= pd.Timestamp(end).strftime("%Y-%m-%d")
+        condition = expr if condition is None else condition & expr
+
+    if columns is not None:
+        columns = [col for col in columns if col in dataset.schema.names]
+    table = dataset.to_table(columns=columns, filter=condition)
+    return table.to_pandas().drop(columns=["product_key"], errors="ignore")
+
+
+def load_table(csv_path, product=None, start=None, end=None, columns=None, store_dir=STORE_DIR):
+    """
+    Load a history table, reading the Parquet store once it holds the full
+    history and the CSV otherwise. Filters behave the same on both paths.
+    """
+    root = store_path_for(csv_path, store_dir)
+    if os.path.exists(os.path.join(root, IMPORTED_MARKER)):
+        return read_partitioned(root, product, start, end, columns)
+
+    data = pd.read_csv(csv_path)
+    if product is not None:
+        data = data[data[product_column(data.columns)] == product]
+    if start is not None or end is not None:
+        dates = pd.to_datetime(data["date"], errors="coerce")
+        if start is not None:
+            data = data[dates >= pd.Timestamp(start)]
+        if end is not None:
+            data = data[dates <= pd.Timestamp(end)]
+    if columns is not None:
+        data = data[[col for col in columns if col in data.columns]]
+    return data
+
+
+def import_csv(csv_path, store_dir=STORE_DIR, renames=None):
+    """
+    Rebuild a CSV history's Parquet store from the CSV and mark it complete.
+    History columns named in `renames` take their new name, as CsvIngestWriter
+    does for the CSV, so imported and ingested rows share one column.
+    """
+    root = store_path_for(csv_path, store_dir)
+    # A store without the marker is partial (e.g. an interrupted import); the CSV has every row
+    shutil.rmtree(root, ignore_errors=True)
+    os.makedirs(root)
+    data = pd.read_csv(csv_path) if os.path.exists(csv_path) else pd.DataFrame()
+    renames = {old: new for old, new in (renames or {}).items() if old in data.columns and new not in data.columns}
+    write_partitioned(data.rename(columns=renames), root)
+    open(os.path.join(root, IMPORTED_MARKER), "w").close()
+    print(f"Imported {len(data)} rows from {csv_path} into {root}")
+
+
+def ensure_store(csv_path, store_dir=STORE_DIR, renames=None):
+    """Import the CSV history into its store unless that was already done. Call before appending batches."""
+    if not os.path.exists(os.path.join(store_path_for(csv_path, store_dir), IMPORTED_MARKER)):
+        import_csv(csv_path, store_dir, renames)
+
+
+if __name__ == "__main__":
+    # Usage: python columnar_store.py competitor_data.csv reviews.csv
+    for path in sys.argv[1:] or ["competitor_data.csv", "reviews.csv"]:
+        # SCRAEP.py's review batches name the text "review"
+        import_csv(path, renames={"review_statements": "review"} if os.path.basename(path) == "reviews.csv" else None)
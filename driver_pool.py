@@ -0,0 +1,125 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import chromedriver_autoinstaller
+
+
+_install_lock = threading.Lock()
+_chromedriver_installed = False
+
+
+# Function to install the matching chromedriver once per process
+def ensure_chromedriver():
+    global _chromedriver_installed
+    with _install_lock:
+        if not _chromedriver_installed:
+            chromedriver_autoinstaller.install()
+            _chromedriver_installed = True
+
+
+class DriverPool:
+    """
+    Bounded pool of long-lived Selenium drivers shared by worker threads.
+
+    Drivers are created lazily (up to `size`), health-checked when leased and
+    recycled after serving `max_pages` pages.
+    """
+
+    def __init__(self, factory, size=4, max_pages=50):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self._idle = []
+        self._pages = {}
+        self._created = 0
+        self._lock = threading.Lock()
+        # Signalled whenever a driver is returned or a slot frees up
+        self._available = threading.Condition(self._lock)
+
+    def acquire(self, timeout=None):
+        """
+        Lease a healthy driver, creating one if the pool is not yet full.
+        Raises queue.Empty if none becomes available within `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._available:
+                while not self._idle and self._created >= self.size:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise queue.Empty
+                    self._available.wait(remaining)
+                driver = self._idle.pop() if self._idle else None
+                if driver is None:
+                    self._created += 1
+
+            if driver is None:
+                driver = self._create()
+            if self._is_healthy(driver):
+                return driver
+            self._discard(driver)
+
+    def release(self, driver):
+        """Return a driver to the pool, recycling it after max_pages pages."""
+        self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+        if self._pages[id(driver)] >= self.max_pages:
+            self._discard(driver)
+        else:
+            with self._available:
+                self._idle.append(driver)
+                self._available.notify()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        except Exception:
+            # A failed page may leave the browser in a bad state, so replace it
+            self._discard(driver)
+            raise
+        else:
+            self.release(driver)
+
+    def close(self):
+        with self._lock:
+            drivers, self._idle = self._idle, []
+        for driver in drivers:
+            self._discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _create(self):
+        # The caller has already reserved a slot in _created
+        try:
+            return self.factory()
+        except Exception:
+            self._release_slot()
+            raise
+
+    def _release_slot(self):
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+
+    def _is_healthy(self, driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception as e:
+            print(f"Discarding unhealthy driver: {e}")
+            return False
+
+    def _discard(self, driver):
+        self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error closing driver: {e}")
+        self._release_slot()
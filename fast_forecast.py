@@ -0,0 +1,222 @@
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+METHODS = ("naive", "drift", "seasonal_naive", "ses", "holt")
+# Display names for captions and reports
+METHOD_NAMES = {
+    "naive": "naive",
+    "drift": "drift",
+    "seasonal_naive": "seasonal-naive",
+    "ses": "exponential-smoothing",
+    "holt": "Holt exponential-smoothing",
+}
+SEASON_LENGTH = 7
+# Smoothing parameters tried for every product at once; the lowest one-step SSE wins per product
+ALPHA_GRID = np.array([0.1, 0.2, 0.3, 0.5, 0.7, 0.9])
+BETA_GRID = np.array([0.05, 0.1, 0.2, 0.3])
+# Live ARIMA fits on longer series take too long for a page load
+LIVE_ARIMA_MAX_POINTS = 730
+Z_95 = 1.959964
+
+
+def to_matrix(series_by_product):
+    """
+    Stack daily series into a products x days matrix, right-aligned on each
+    series' last day and NaN-padded on the left. Returns (products, matrix,
+    last_dates).
+    """
+    products = list(series_by_product)
+    width = max((len(series) for series in series_by_product.values()), default=0)
+    matrix = np.full((len(products), width), np.nan)
+    last_dates = []
+    for row, product in enumerate(products):
+        values = np.asarray(series_by_product[product], dtype="float64")
+        if len(values):
+            matrix[row, width - len(values):] = values
+        last_dates.append(series_by_product[product].index[-1] if len(values) else pd.NaT)
+    return products, matrix, last_dates
+
+
+def _first_last(matrix):
+    valid = ~np.isnan(matrix)
+    counts = valid.sum(axis=1)
+    first_idx = np.argmax(valid, axis=1)
+    rows = np.arange(len(matrix))
+    return matrix[rows, first_idx], matrix[:, -1], counts
+
+
+def _naive(matrix, days):
+    _, last, _ = _first_last(matrix)
+    forecast = np.repeat(last[:, None], days, axis=1)
+    residuals = np.diff(matrix, axis=1)
+    return forecast, residuals
+
+
+def _drift(matrix, days):
+    first, last, counts = _first_last(matrix)
+    slope = np.where(counts > 1, (last - first) / np.maximum(counts - 1, 1), 0.0)
+    forecast = last[:, None] + slope[:, None] * np.arange(1, days + 1)
+    residuals = np.diff(matrix, axis=1) - slope[:, None]
+    return forecast, residuals
+
+
+def _seasonal_naive(matrix, days, season=SEASON_LENGTH):
+    if matrix.shape[1] < season:
+        return _naive(matrix, days)
+    last_season = matrix[:, -season:]
+    forecast = last_season[:, np.arange(days) % season]
+    # Rows without a full season fall back to the last value
+    _, last, counts = _first_last(matrix)
+    short = counts < season
+    forecast[short] = last[short, None]
+    residuals = matrix[:, season:] - matrix[:, :-season]
+    return forecast, residuals
+
+
+def _smooth(matrix, alpha, beta=None):
+    """
+    Run SES (beta None) or Holt's linear method across all rows at once for
+    one (alpha, beta). Holt starts from the first two points (level and
+    first difference). Returns (level, trend, one-step errors).
+    """
+    n_rows, width = matrix.shape
+    level = np.zeros(n_rows)
+    trend = np.zeros(n_rows)
+    seen = np.zeros(n_rows, dtype=int)
+    errors = np.full((n_rows, width), np.nan)
+    warmup = 1 if beta is None else 2
+    for t in range(width):
+        x = matrix[:, t]
+        observed = ~np.isnan(x)
+        first = observed & (seen == 0)
+        second = observed & (seen == 1) & (warmup == 2)
+        update = observed & (seen >= warmup)
+
+        prediction = level + trend
+        errors[update, t] = x[update] - prediction[update]
+        new_level = alpha * x + (1 - alpha) * prediction
+        if beta is not None:
+            trend = np.where(update, beta * (new_level - level) + (1 - beta) * trend, trend)
+            trend = np.where(second, x - level, trend)
+        level = np.where(update, new_level, level)
+        level = np.where(first | second, x, level)
+        seen += observed
+    return level, trend, errors
+
+
+def _best_smoothing(matrix, days, holt):
+    """Fit the smoothing grid for all rows and keep each row's best parameters."""
+    grid = [(alpha, beta) for alpha in ALPHA_GRID for beta in BETA_GRID] if holt else [(a, None) for a in ALPHA_GRID]
+    best_sse = np.full(len(matrix), np.inf)
+    forecast = np.full((len(matrix), days), np.nan)
+    residuals = np.full(matrix.shape, np.nan)
+    steps = np.arange(1, days + 1)
+    for alpha, beta in grid:
+        level, trend, errors = _smooth(matrix, alpha, beta)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            sse = np.nansum(errors ** 2, axis=1)
+        better = sse < best_sse
+        best_sse[better] = sse[better]
+        forecast[better] = level[better, None] + trend[better, None] * steps
+        residuals[better] = errors[better]
+    # Rows with a single point have no errors; their forecast is the point itself
+    single = np.isinf(best_sse)
+    if single.any():
+        _, last, _ = _first_last(matrix[single])
+        forecast[single] = last[:, None]
+    return forecast, residuals
+
+
+def forecast_matrix(matrix, method="holt", days=7):
+    """
+    Forecast every row of a products x days matrix with one closed-form method.
+    Returns (forecast, lower, upper), each products x days, with 95% bands from
+    the one-step residual spread widened by sqrt(horizon).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}; expected one of {METHODS}.")
+    if method == "naive":
+        forecast, residuals = _naive(matrix, days)
+    elif method == "drift":
+        forecast, residuals = _drift(matrix, days)
+    elif method == "seasonal_naive":
+        forecast, residuals = _seasonal_naive(matrix, days)
+    else:
+        forecast, residuals = _best_smoothing(matrix, days, holt=method == "holt")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        sigma = np.nan_to_num(np.nanstd(residuals, axis=1)) if residuals.shape[1] else np.zeros(len(matrix))
+    spread = Z_95 * sigma[:, None] * np.sqrt(np.arange(1, days + 1))
+    return forecast, forecast - spread, forecast + spread
+
+
+def forecast_table(series_by_product, method="holt", days=7):
+    """
+    Forecast many daily series in one vectorized call. Returns a long frame
+    with product, Date, Predicted_Discount, Lower_Bound and Upper_Bound.
+    """
+    products, matrix, last_dates = to_matrix(series_by_product)
+    forecast, lower, upper = forecast_matrix(matrix, method, days)
+    steps = np.arange(1, days + 1).astype("timedelta64[D]")
+    dates = np.asarray(last_dates, dtype="datetime64[ns]")[:, None] + steps
+    return pd.DataFrame({
+        "product": np.repeat(np.asarray(products, dtype=object), days),
+        "Date": dates.ravel(),
+        "Predicted_Discount": forecast.ravel(),
+        "Lower_Bound": lower.ravel(),
+        "Upper_Bound": upper.ravel(),
+    })
+
+
+def default_method(series):
+    """forecast_series()'s method for a series: Holt, or naive below five points."""
+    return "holt" if len(pd.Series(series).dropna()) >= 5 else "naive"
+
+
+def forecast_series(series, days=7, method=None):
+    """
+    Fast forecast of one series, used when ARIMA has too little data or too
+    much to fit live. The method defaults to Holt, or naive below five points.
+    """
+    series = pd.Series(series).dropna()
+    if series.empty:
+        return pd.DataFrame(columns=["Predicted_Discount", "Lower_Bound", "Upper_Bound"],
+                            index=pd.DatetimeIndex([], name="Date"))
+    if not isinstance(series.index, pd.DatetimeIndex):
+        series.index = pd.to_datetime(series.index)
+    method = method or default_method(series)
+    table = forecast_table({"series": series}, method, days)
+    return table.drop(columns="product").set_index("Date")
+
+
+# Benchmark against per-product ARIMA fits
+def run_benchmark(n_products=5_000, n_days=120, days=7, arima_sample=20):
+    from statsmodels.tsa.arima.model import ARIMA
+
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2025-01-01", periods=n_days, freq="D")
+    walks = 30 + np.cumsum(rng.normal(0, 1, (n_products, n_days)), axis=1)
+    series_by_product = {f"product-{i}": pd.Series(walks[i], index=dates) for i in range(n_products)}
+
+    for method in METHODS:
+        start = time.perf_counter()
+        forecast_table(series_by_product, method, days)
+        elapsed = time.perf_counter() - start
+        print(f"{method}: {n_products:,} products in {elapsed:.2f}s ({n_products / elapsed:,.0f} products/s)")
+
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for i in range(arima_sample):
+            ARIMA(series_by_product[f"product-{i}"], order=(2, 1, 0)).fit().forecast(days)
+    per_product = (time.perf_counter() - start) / arima_sample
+    print(f"ARIMA(2,1,0): {1 / per_product:,.0f} products/s "
+          f"(~{per_product * n_products:.0f}s for the whole catalog)")
+
+
+if __name__ == "__main__":
+    run_benchmark()
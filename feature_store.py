@@ -0,0 +1,204 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+# Bump when the feature definitions change; a stored table of another version is rebuilt
+FEATURE_VERSION = "v1"
+VALUE_COLUMNS = ["price", "discount"]
+LAGS = (1, 7)
+ROLLING_WINDOW = 7
+# Stored rows needed before the first changed day to recompute its lags and windows
+LOOKBACK_ROWS = max(max(LAGS), ROLLING_WINDOW - 1)
+
+FEATURE_COLUMNS = (
+    VALUE_COLUMNS
+    + [f"{column}_lag_{lag}" for column in VALUE_COLUMNS for lag in LAGS]
+    + [f"{column}_mean_{ROLLING_WINDOW}" for column in VALUE_COLUMNS]
+    + [f"{column}_volatility_{ROLLING_WINDOW}" for column in VALUE_COLUMNS]
+    + ["day_of_week"]
+)
+TARGET_COLUMNS = ["next_price", "next_discount"]
+STORED_COLUMNS = ["product_name", "date"] + FEATURE_COLUMNS + TARGET_COLUMNS
+
+
+def daily_values(snapshots):
+    """One price and discount per product and day (the day's mean), sorted by product and date."""
+    snapshots = snapshots.assign(date=pd.to_datetime(snapshots["date"], errors="coerce"))
+    snapshots = snapshots.dropna(subset=["product_name", "date"])
+    daily = snapshots.groupby(["product_name", "date"], as_index=False)[VALUE_COLUMNS].mean()
+    return daily.sort_values(["product_name", "date"], ignore_index=True)
+
+
+def compute_features(daily):
+    """
+    Add lag, rolling mean, rolling volatility, day-of-week and next-day
+    targets to daily rows of many products at once. Lags and windows count
+    a product's observed days, so they never cross from one product into
+    the next.
+    """
+    daily = daily.sort_values(["product_name", "date"], ignore_index=True)
+    groups = daily.groupby("product_name", sort=False)
+    features = {}
+    for column in VALUE_COLUMNS:
+        for lag in LAGS:
+            features[f"{column}_lag_{lag}"] = groups[column].shift(lag)
+        rolling = groups[column].rolling(ROLLING_WINDOW, min_periods=1)
+        features[f"{column}_mean_{ROLLING_WINDOW}"] = rolling.mean().reset_index(level=0, drop=True)
+        features[f"{column}_volatility_{ROLLING_WINDOW}"] = rolling.std().reset_index(level=0, drop=True)
+        features[f"next_{column}"] = groups[column].shift(-1)
+    features["day_of_week"] = pd.to_datetime(daily["date"]).dt.dayofweek
+    return daily.assign(**features)
+
+
+def _stored_version(conn):
+    row = conn.execute("SELECT feature_version, last_rowid FROM feature_progress").fetchone()
+    return row if row else (None, 0)
+
+
+def _write_rows(conn, rows):
+    rows = rows.assign(date=pd.to_datetime(rows["date"]).dt.strftime("%Y-%m-%d"))[STORED_COLUMNS]
+    rows = rows.astype(object).where(rows.notna(), None)
+    placeholders = ", ".join("?" * len(STORED_COLUMNS))
+    conn.executemany(f"INSERT OR REPLACE INTO price_features VALUES ({placeholders})",
+                     rows.itertuples(index=False, name=None))
+
+
+def refresh_features(conn):
+    """
+    Fold snapshots added since the last refresh into price_features.
+
+    For each product with new rows, only the days from its first changed
+    day on are recomputed, from the new snapshots plus the last
+    LOOKBACK_ROWS stored days before them; the next-day targets of the day
+    just before are updated too. Returns the number of days written.
+    """
+    version, last_rowid = _stored_version(conn)
+    if version != FEATURE_VERSION:
+        with conn:
+            conn.execute("DELETE FROM price_features")
+            conn.execute("DELETE FROM feature_progress")
+        last_rowid = 0
+
+    new = pd.read_sql_query("SELECT rowid, product_name, date FROM competitor_snapshots WHERE rowid > ?",
+                            conn, params=[last_rowid])
+    if new.empty:
+        return 0
+    first_changed = new.dropna(subset=["date"]).groupby("product_name")["date"].min()
+
+    if last_rowid == 0:
+        # First build: every day is new, so read the history in one scan
+        recent = pd.read_sql_query("SELECT product_name, date, price, discount FROM competitor_snapshots", conn)
+        history = pd.DataFrame(columns=["product_name", "date"] + VALUE_COLUMNS)
+    else:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS feature_changes (product_name TEXT PRIMARY KEY, first_date TEXT)")
+        conn.execute("DELETE FROM feature_changes")
+        conn.executemany("INSERT INTO feature_changes VALUES (?, ?)", first_changed.items())
+        # CROSS JOIN keeps the short change list as the outer loop so both reads are index range scans
+        recent = pd.read_sql_query(
+            "SELECT s.product_name, s.date, s.price, s.discount FROM feature_changes c "
+            "CROSS JOIN competitor_snapshots s ON s.product_name = c.product_name AND s.date >= c.first_date",
+            conn,
+        )
+        # The last LOOKBACK_ROWS stored days before each product's first changed day, by index seeks
+        history = pd.read_sql_query(
+            "SELECT f.product_name, f.date, f.price, f.discount FROM feature_changes c "
+            "CROSS JOIN price_features f ON f.product_name = c.product_name AND f.date < c.first_date "
+            "AND f.date >= COALESCE((SELECT p.date FROM price_features p "
+            "    WHERE p.product_name = c.product_name AND p.date < c.first_date "
+            "    ORDER BY p.date DESC LIMIT 1 OFFSET ?), '')",
+            conn, params=[LOOKBACK_ROWS - 1],
+        )
+    recent = daily_values(recent)
+    history["date"] = pd.to_datetime(history["date"])
+    features = compute_features(pd.concat([history.assign(stored=True), recent.assign(stored=False)],
+                                          ignore_index=True))
+
+    stored = features["stored"].to_numpy(dtype=bool)
+    # The stored day right before each product's new days gets its next-day targets
+    last_stored = stored & ~np.roll(stored, -1) & (features["product_name"] == features["product_name"].shift(-1))
+    with conn:
+        _write_rows(conn, features[~stored])
+        conn.executemany(
+            "UPDATE price_features SET next_price = ?, next_discount = ? WHERE product_name = ? AND date = ?",
+            [(None if pd.isna(price) else price, None if pd.isna(discount) else discount, product,
+              date.strftime("%Y-%m-%d"))
+             for product, date, price, discount in features.loc[last_stored, ["product_name", "date", *TARGET_COLUMNS]]
+             .itertuples(index=False, name=None)],
+        )
+        conn.execute("INSERT OR REPLACE INTO feature_progress VALUES (?, ?, ?)",
+                     ["price_features", FEATURE_VERSION, int(new["rowid"].max())])
+    return int((~stored).sum())
+
+
+def feature_matrix(conn, target="next_price", columns=FEATURE_COLUMNS, products=None, start=None, end=None):
+    """
+    Stored features as (X, y, keys) for any model, with keys holding each
+    row's product_name and date. Rows without a target (each product's
+    latest day) or with incomplete lags are left out.
+    """
+    query = f"SELECT product_name, date, {', '.join(columns)}, {target} FROM price_features WHERE 1 = 1"
+    params = []
+    if products is not None:
+        query += f" AND product_name IN ({', '.join('?' * len(products))})"
+        params += list(products)
+    if start is not None:
+        query += " AND date >= ?"
+        params.append(pd.Timestamp(start).strftime("%Y-%m-%d"))
+    if end is not None:
+        query += " AND date <= ?"
+        params.append(pd.Timestamp(end).strftime("%Y-%m-%d"))
+    rows = pd.read_sql_query(query + " ORDER BY product_name, date", conn, params=params)
+    rows = rows.dropna(subset=list(columns) + [target]).reset_index(drop=True)
+    rows["date"] = pd.to_datetime(rows["date"])
+    return rows[list(columns)], rows[target], rows[["product_name", "date"]]
+
+
+def latest_features(conn, columns=FEATURE_COLUMNS):
+    """Each product's most recent feature row, for predicting the next day."""
+    rows = pd.read_sql_query(
+        f"SELECT product_name, date, {', '.join(columns)} FROM price_features "
+        "WHERE (product_name, date) IN (SELECT product_name, MAX(date) FROM price_features GROUP BY product_name)",
+        conn,
+    )
+    rows["date"] = pd.to_datetime(rows["date"])
+    return rows
+
+
+# Benchmark: incremental refresh of one new day vs recomputing the whole history
+def run_benchmark(n_products=2_000, n_days=365):
+    from sql_store import connect
+
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2025-01-01", periods=n_days + 1, freq="D")
+    products = np.repeat([f"product-{i}" for i in range(n_products)], n_days + 1)
+    snapshots = pd.DataFrame({
+        "product_name": products,
+        "date": np.tile(dates.strftime("%Y-%m-%d"), n_products),
+        "price": rng.uniform(100, 5000, len(products)).round(2),
+        "discount": rng.integers(0, 80, len(products)).astype(float),
+    })
+    history, latest = snapshots[snapshots["date"] < dates[-1].strftime("%Y-%m-%d")], \
+        snapshots[snapshots["date"] == dates[-1].strftime("%Y-%m-%d")]
+
+    conn = connect(":memory:")
+    columns = ["product_name", "date", "price", "discount"]
+    conn.executemany("INSERT INTO competitor_snapshots (product_name, date, price, discount) VALUES (?, ?, ?, ?)",
+                     history[columns].itertuples(index=False, name=None))
+    start = time.perf_counter()
+    refresh_features(conn)
+    print(f"Initial build: {n_products:,} products x {n_days} days in {time.perf_counter() - start:.2f}s")
+
+    conn.executemany("INSERT INTO competitor_snapshots (product_name, date, price, discount) VALUES (?, ?, ?, ?)",
+                     latest[columns].itertuples(index=False, name=None))
+    start = time.perf_counter()
+    refresh_features(conn)
+    print(f"Incremental refresh of one new day: {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    compute_features(daily_values(snapshots))
+    print(f"Full in-memory recompute of all days: {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    run_benchmark()
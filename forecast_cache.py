@@ -0,0 +1,90 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+MAX_ENTRIES = 256
+
+
+def series_fingerprint(series):
+    """Content hash of a series' dates and values."""
+    hashed = pd.util.hash_pandas_object(pd.Series(series), index=True).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+
+class ForecastCache:
+    """
+    In-memory LRU of forecasts keyed by (product, order, series hash, horizon).
+
+    Storing a forecast for a new series of a product drops that product's
+    entries for older series, so new snapshots invalidate stale forecasts.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            forecast = self._entries.get(key)
+            if forecast is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return forecast.copy()
+
+    def put(self, key, forecast):
+        product, order, fingerprint, horizon = key
+        with self._lock:
+            for stale in [k for k in self._entries if k[:2] == (product, order) and k[2] != fingerprint]:
+                del self._entries[stale]
+            self._entries[key] = forecast.copy()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, product=None):
+        """Drop one product's forecasts, or everything when product is None."""
+        with self._lock:
+            for key in [k for k in self._entries if product is None or k[0] == product]:
+                del self._entries[key]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+            "evictions": self.evictions,
+        }
+
+
+_shared_cache = ForecastCache()
+
+
+def get_forecast_cache():
+    """Process-wide cache; survives Streamlit reruns because the module stays imported."""
+    return _shared_cache
+
+
+def cached_forecast(product, order, series, horizon, fit_fn, cache=None):
+    """
+    Return the cached forecast for this exact series, or call fit_fn() and cache its result.
+    Empty results (failed or skipped fits) are not cached.
+    """
+    cache = cache or _shared_cache
+    key = (product, tuple(order), series_fingerprint(series), horizon)
+    forecast = cache.get(key)
+    if forecast is None:
+        forecast = fit_fn()
+        if forecast is not None and not forecast.empty:
+            cache.put(key, forecast)
+    return forecast
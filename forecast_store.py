@@ -0,0 +1,196 @@
+import argparse
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from arima_order import FALLBACK_ORDER, order_key, refresh_orders
+from arima_state import advance, load_states, save_states
+from fast_forecast import forecast_table
+from normalize import parse_discount
+from sql_store import connect
+
+# Stands for each product's searched order (see arima_order.py)
+AUTO_ORDER = "auto"
+FORECAST_ORDERS = [AUTO_ORDER]
+FORECAST_DAYS = 7
+CONFIDENCE_LEVEL = 0.95
+MIN_OBSERVATIONS = 5
+
+FORECAST_COLUMNS = ["Predicted_Discount", "Lower_Bound", "Upper_Bound"]
+
+
+def daily_discount_series(history):
+    """One discount per calendar day (the day's mean), forward-filled over missing days."""
+    history = history.assign(date=pd.to_datetime(history["date"], errors="coerce"),
+                             discount=parse_discount(history["discount"]).to_numpy())
+    series = history.dropna(subset=["date", "discount"]).groupby("date")["discount"].mean()
+    if series.empty:
+        return series
+    return series.asfreq("D").ffill()
+
+
+def forecast_frame(model_fit, last_observed, days=FORECAST_DAYS, confidence=CONFIDENCE_LEVEL):
+    """Forecast `days` ahead as a frame indexed by Date with the prediction and its confidence interval."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        forecast = model_fit.get_forecast(steps=days)
+    bounds = forecast.conf_int(alpha=1 - confidence)
+    future_dates = pd.date_range(start=last_observed + pd.Timedelta(days=1), periods=days)
+    return pd.DataFrame({
+        "Predicted_Discount": forecast.predicted_mean.to_numpy(),
+        "Lower_Bound": bounds.iloc[:, 0].to_numpy(),
+        "Upper_Bound": bounds.iloc[:, 1].to_numpy(),
+    }, index=pd.Index(future_dates, name="Date"))
+
+
+def fit_forecast(series, order, days=FORECAST_DAYS, confidence=CONFIDENCE_LEVEL):
+    """Fit ARIMA to a daily series from scratch and forecast `days` ahead."""
+    from statsmodels.tsa.arima.model import ARIMA
+
+    with warnings.catch_warnings():
+        # Short scraped series routinely trigger convergence and frequency warnings
+        warnings.simplefilter("ignore")
+        model_fit = ARIMA(series, order=order).fit()
+    return forecast_frame(model_fit, series.index[-1], days, confidence)
+
+
+def _fit_task(product, order, series, days, state):
+    # Runs in a worker process; failures are reported instead of sinking the batch
+    try:
+        model_fit, state, mode = advance(product, series, order, state)
+        return product, forecast_frame(model_fit, series.index[-1], days), state, mode, None
+    except Exception as e:
+        return product, None, None, None, str(e)
+
+
+def _fit_task_fixed(product, order, series, days):
+    # Explicit orders are fitted from scratch and keep no state
+    try:
+        return product, fit_forecast(series, order, days), None, "refit", None
+    except Exception as e:
+        return product, None, None, None, str(e)
+
+
+def load_series(conn):
+    history = pd.read_sql_query("SELECT product_name, date, discount FROM competitor_snapshots", conn)
+    return {product: daily_discount_series(rows) for product, rows in history.groupby("product_name")}
+
+
+def save_forecast(conn, product, order, forecast, last_observed):
+    """Replace the stored forecast of one product and order."""
+    generated_at = datetime.now().isoformat(timespec="seconds")
+    rows = [
+        (product, order_key(order), date.strftime("%Y-%m-%d"), *values,
+         pd.Timestamp(last_observed).strftime("%Y-%m-%d"), generated_at)
+        for date, values in zip(forecast.index, forecast[FORECAST_COLUMNS].itertuples(index=False, name=None))
+    ]
+    with conn:
+        conn.execute("DELETE FROM discount_forecasts WHERE product_name = ? AND arima_order = ?",
+                     [product, order_key(order)])
+        conn.executemany("INSERT INTO discount_forecasts VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+def save_forecast_table(conn, order, table, last_observed):
+    """Replace the stored forecasts of every product in a forecast_table() frame in one transaction."""
+    generated_at = datetime.now().isoformat(timespec="seconds")
+    products = table["product"].unique().tolist()
+    rows = [
+        (product, order_key(order), date.strftime("%Y-%m-%d"), *values,
+         pd.Timestamp(last_observed[product]).strftime("%Y-%m-%d"), generated_at)
+        for product, date, *values in table[["product", "Date"] + FORECAST_COLUMNS].itertuples(index=False, name=None)
+    ]
+    with conn:
+        conn.executemany("DELETE FROM discount_forecasts WHERE product_name = ? AND arima_order = ?",
+                         [(product, order_key(order)) for product in products])
+        conn.executemany("INSERT INTO discount_forecasts VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+def precompute_forecasts(conn, orders=FORECAST_ORDERS, days=FORECAST_DAYS, workers=None):
+    """
+    Fit every product and order in a process pool and store the forecasts.
+    AUTO_ORDER uses each product's persisted order, searching only products
+    whose order is missing or stale. Its fitted state is kept between runs
+    and only the new days are filtered, with full refits on a schedule or on
+    drift (see arima_state.py). Products ARIMA cannot handle (fewer than
+    MIN_OBSERVATIONS days, a constant discount, or a failed fit) get a
+    vectorized fast_forecast.py forecast under AUTO_ORDER instead.
+    Returns (fitted, failed) counts.
+    """
+    start = time.perf_counter()
+    all_series = {product: series for product, series in load_series(conn).items() if not series.empty}
+    series_by_product = {product: series for product, series in all_series.items()
+                         if len(series) >= MIN_OBSERVATIONS and series.std() > 0}
+    fallback = [product for product in all_series if product not in series_by_product]
+    fitted = failed = 0
+    modes = {}
+    states = load_states(conn)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        searched = refresh_orders(conn, series_by_product, pool=pool) if AUTO_ORDER in orders else {}
+        futures = []
+        for product, series in series_by_product.items():
+            for order in orders:
+                if order == AUTO_ORDER:
+                    task = (product, searched.get(product, FALLBACK_ORDER), series, days, states.get(product))
+                    futures.append((order, pool.submit(_fit_task, *task)))
+                else:
+                    futures.append((order, pool.submit(_fit_task_fixed, product, order, series, days)))
+        updated = []
+        for order, future in futures:
+            product, forecast, state, mode, error = future.result()
+            if error is not None:
+                print(f"Forecast failed for {product} {order}: {error}")
+                if order == AUTO_ORDER:
+                    fallback.append(product)
+                else:
+                    failed += 1
+                continue
+            save_forecast(conn, product, order, forecast, series_by_product[product].index[-1])
+            if state is not None:
+                updated.append(state)
+            modes[mode] = modes.get(mode, 0) + 1
+            fitted += 1
+        save_states(conn, updated)
+    if fallback and AUTO_ORDER in orders:
+        table = forecast_table({product: all_series[product] for product in fallback}, days=days)
+        save_forecast_table(conn, AUTO_ORDER, table, {product: all_series[product].index[-1] for product in fallback})
+        modes["fast"] = len(fallback)
+        fitted += len(fallback)
+    print(f"Stored {fitted} forecasts for {len(all_series)} products in "
+          f"{time.perf_counter() - start:.1f}s ({failed} failed, {modes})")
+    return fitted, failed
+
+
+def stored_forecast(conn, product, order, days=None):
+    """
+    The stored forecast for a product and order, indexed by Date. Empty if none
+    is stored or if it was fitted before the product's latest discount snapshot,
+    so callers fall back to a live fit until refresh_job.py runs again.
+    """
+    forecast = pd.read_sql_query(
+        "SELECT date, predicted_discount, lower_bound, upper_bound, last_observed FROM discount_forecasts "
+        "WHERE product_name = ? AND arima_order = ? ORDER BY date",
+        conn,
+        params=[product, order_key(order)],
+    )
+    if not forecast.empty:
+        latest = conn.execute("SELECT MAX(date) FROM competitor_snapshots WHERE product_name = ? "
+                              "AND discount IS NOT NULL", [product]).fetchone()[0]
+        if latest is not None and pd.Timestamp(latest) > pd.Timestamp(forecast["last_observed"].iloc[0]):
+            forecast = forecast.iloc[0:0]
+    forecast = forecast.drop(columns="last_observed")
+    forecast.columns = ["Date"] + FORECAST_COLUMNS
+    forecast["Date"] = pd.to_datetime(forecast["Date"])
+    forecast = forecast.set_index("Date")
+    return forecast.head(days) if days else forecast
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute ARIMA discount forecasts for every product.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores).")
+    parser.add_argument("--days", type=int, default=FORECAST_DAYS, help="Forecast horizon in days.")
+    args = parser.parse_args()
+    precompute_forecasts(connect(), days=args.days, workers=args.workers)
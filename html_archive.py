@@ -0,0 +1,180 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+import pandas as pd
+
+from page_extractor import extract_product_fields, extract_rendered_fields
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+
+ARCHIVE_DIR = "html_archive"
+INDEX_FILE = "index.jsonl"
+
+# Where a capture came from: raw HTTP responses (scrape.py) or Selenium page_source (SCRAEP.py).
+# Entries written before sources were recorded are HTTP captures.
+SOURCE_HTTP = "http"
+SOURCE_SELENIUM = "selenium"
+EXTRACTORS = {SOURCE_HTTP: extract_product_fields, SOURCE_SELENIUM: extract_rendered_fields}
+# Rows without this field are dropped from a replay
+REQUIRED_FIELD = {SOURCE_HTTP: "title", SOURCE_SELENIUM: "selling price"}
+REPLAY_OUTPUT = {SOURCE_HTTP: "amazon_products.csv", SOURCE_SELENIUM: "rendered_products.csv"}
+
+# Query parameters that only track the visit and never change the page
+TRACKING_PARAMS = {
+    "ref", "ref_", "crid", "dib", "dib_tag", "qid", "sprefix", "sr", "keywords",
+    "sp_csd", "psc", "th", "nsdoptoutparam", "refinements", "rnid", "s",
+}
+
+_index_lock = threading.Lock()
+
+
+def canonical_url(url):
+    """Normalize a product URL so repeated visits map to the same key."""
+    parts = urlsplit(url.strip())
+    path = parts.path
+    # Amazon appends the tracking token as a path segment (/dp/ASIN/ref=sr_1_1)
+    if "/ref=" in path:
+        path = path.split("/ref=")[0]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path.rstrip("/") or "/", urlencode(query), ""))
+
+
+def _compress(content):
+    if zstandard is not None:
+        return "zst", zstandard.ZstdCompressor(level=10).compress(content)
+    return "gz", gzip.compress(content, compresslevel=6)
+
+
+def _decompress(codec, blob):
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("Archive entry is zstd-compressed but the zstandard package is not installed.")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return gzip.decompress(blob)
+
+
+def _object_path(archive_dir, digest, codec):
+    return os.path.join(archive_dir, "objects", digest[:2], f"{digest}.html.{codec}")
+
+
+def archive_page(url, content, fetched_at=None, archive_dir=ARCHIVE_DIR, source=SOURCE_HTTP):
+    """Store raw page bytes by content hash and record the visit, tagged with its source, in the index."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    digest = hashlib.sha256(content).hexdigest()
+    fetched_at = fetched_at or datetime.now().isoformat(timespec="seconds")
+
+    codec, blob = _compress(content)
+    path = _object_path(archive_dir, digest, codec)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique per call: SCRAEP.py archives from several threads of one process
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    entry = {"url": canonical_url(url), "fetched_at": fetched_at, "sha256": digest, "codec": codec,
+             "source": source}
+    with _index_lock:
+        with open(os.path.join(archive_dir, INDEX_FILE), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    return digest
+
+
+def load_index(archive_dir=ARCHIVE_DIR, latest_only=False, source=None):
+    """Return the archive index as a list of entries, oldest first, optionally for one source."""
+    index_path = os.path.join(archive_dir, INDEX_FILE)
+    if not os.path.exists(index_path):
+        return []
+    with open(index_path, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    for entry in entries:
+        entry.setdefault("source", SOURCE_HTTP)
+    if source is not None:
+        entries = [entry for entry in entries if entry["source"] == source]
+    entries.sort(key=lambda entry: entry["fetched_at"])
+    if latest_only:
+        entries = list({(entry["url"], entry["source"]): entry for entry in entries}.values())
+    return entries
+
+
+def load_page(entry, archive_dir=ARCHIVE_DIR):
+    with open(_object_path(archive_dir, entry["sha256"], entry["codec"]), "rb") as f:
+        return _decompress(entry["codec"], f.read())
+
+
+def _extract_entry(args):
+    entry, archive_dir = args
+    fields = EXTRACTORS[entry["source"]](load_page(entry, archive_dir))
+    if entry["source"] == SOURCE_SELENIUM:
+        fields["product_url"] = entry["url"]
+    fields["date"] = entry["fetched_at"][:10]
+    return fields
+
+
+def replay(archive_dir=ARCHIVE_DIR, output_path=None, workers=None, latest_only=False, source=SOURCE_HTTP):
+    """
+    Re-run one source's extractors over its archived pages (no network) across
+    all cores: scrape.py's field extractors for HTTP captures, SCRAEP.py's
+    XPaths for Selenium captures.
+    """
+    output_path = output_path or REPLAY_OUTPUT[source]
+    entries = load_index(archive_dir, latest_only, source)
+    if not entries:
+        print(f"No archived {source} pages found in {archive_dir}.")
+        return pd.DataFrame()
+
+    workers = workers or os.cpu_count()
+    chunksize = max(1, len(entries) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        rows = list(executor.map(_extract_entry, [(entry, archive_dir) for entry in entries], chunksize=chunksize))
+
+    df = pd.DataFrame(rows)
+    required = REQUIRED_FIELD[source]
+    df[required] = df[required].replace(["", 0], np.nan)
+    df = df.dropna(subset=[required])  # Drop rows without a title (or price, for rendered pages)
+    df.to_csv(output_path, index=False)
+    print(f"Replayed {len(entries)} archived pages into {len(df)} rows saved to {output_path}")
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Raw HTML archive tools.")
+    parser.add_argument("--replay", action="store_true", help="Re-run the extractors over the archive offline.")
+    parser.add_argument("--archive", default=ARCHIVE_DIR, help="Archive directory.")
+    parser.add_argument("--source", choices=sorted(EXTRACTORS), default=SOURCE_HTTP,
+                        help="Captures to replay: http (scrape.py) or selenium (SCRAEP.py).")
+    parser.add_argument("--output", default=None,
+                        help="CSV written by --replay (default: amazon_products.csv or rendered_products.csv).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores).")
+    parser.add_argument("--latest", action="store_true", help="Only replay the newest capture of each URL.")
+    args = parser.parse_args()
+
+    if args.replay:
+        replay(args.archive, args.output, args.workers, args.latest, args.source)
+    else:
+        entries = load_index(args.archive, source=args.source)
+        print(f"{len(entries)} {args.source} captures of {len({entry['url'] for entry in entries})} URLs "
+              f"in {args.archive}")
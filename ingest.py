@@ -0,0 +1,107 @@
+import csv
+import os
+
+import pandas as pd
+
+
+def _atomic_write_csv(df, path):
+    """Write a CSV to a temporary file and swap it in, so readers never see a partial file."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_csv(tmp_path, index=False)
+    with open(tmp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_header(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+class CsvIngestWriter:
+    """
+    Buffer scraped rows and append them to a CSV in batches.
+
+    Existing history is never rewritten on the hot path: each flush appends
+    only the buffered rows, so a run costs O(new rows) instead of O(history).
+    If the file's header does not match `columns`, it is migrated once with an
+    atomic replace: history columns named in `renames` take the writer's name
+    and missing columns are added. History columns the writer does not know
+    are kept (empty for new rows), so a migration never drops data.
+    Every flushed batch is also passed to each callable in `sinks`
+    (e.g. the Parquet and SQLite stores).
+    """
+
+    def __init__(self, path, columns, batch_size=50, renames=None, sinks=()):
+        self.path = path
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.renames = dict(renames or {})
+        self.sinks = list(sinks)
+        self.rows_written = 0
+        self._buffer = []
+        self._file_columns = None
+
+    def add(self, row):
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        batch = pd.DataFrame(self._buffer, columns=self.columns)
+
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            _atomic_write_csv(batch, self.path)
+            self._file_columns = self.columns
+        else:
+            if self._file_columns is None:
+                self._file_columns = self._prepare_header()
+            self._append(batch.reindex(columns=self._file_columns))
+        # The CSV has the rows now; a failing sink must not make close() append them again
+        self._buffer = []
+        self.rows_written += len(batch)
+        for sink in self.sinks:
+            sink(batch)
+
+    def _prepare_header(self):
+        header = _read_header(self.path)
+        if header == self.columns:
+            return header
+        # Rename only when the new name is not already a history column
+        renames = {old: new for old, new in self.renames.items() if old in header and new not in header}
+        renamed = [renames.get(col, col) for col in header]
+        target = renamed + [col for col in self.columns if col not in renamed]
+        if target != header:
+            history = pd.read_csv(self.path).rename(columns=renames)
+            _atomic_write_csv(history.reindex(columns=target), self.path)
+            print(f"Migrated {self.path} header to {target}")
+        return target
+
+    def _append(self, batch):
+        payload = batch.to_csv(header=False, index=False)
+        with open(self.path, "a+b") as f:
+            size = f.tell()
+            # Guard against a previous write that stopped before its line terminator
+            if size:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    payload = "\n" + payload
+            try:
+                f.write(payload.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                # Roll back the partial batch; history before `size` is untouched
+                f.truncate(size)
+                raise
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
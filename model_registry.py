@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+
+from sentiment import SENTIMENT_MODEL
+
+
+VADER_MODEL = "vader"
+
+_models = {}
+_stats = {}
+_loaders = {}
+_registry_lock = threading.Lock()
+_load_locks = {}
+
+
+def _rss_bytes():
+    """Current resident set size of this process (0 where it cannot be read)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # Peak RSS is the closest portable figure (KiB on Linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return 0
+
+
+def _load_sentiment_pipeline(model_id):
+    from transformers import pipeline
+
+    return pipeline("sentiment-analysis", model=model_id, device=-1)
+
+
+def _load_vader(model_id):
+    import nltk
+    from nltk.sentiment import SentimentIntensityAnalyzer
+
+    try:
+        nltk.data.find("sentiment/vader_lexicon.zip")
+    except LookupError:
+        nltk.download("vader_lexicon", quiet=True)
+    return SentimentIntensityAnalyzer()
+
+
+def register_model(model_id, loader):
+    """Register loader(model_id) for a model; nothing is loaded until get_model()."""
+    with _registry_lock:
+        _loaders[model_id] = loader
+
+
+def get_model(model_id=SENTIMENT_MODEL):
+    """
+    Return the process-wide instance of a model, loading it on first use.
+
+    Unregistered ids are treated as transformers sentiment-analysis models.
+    Concurrent first calls for the same model wait for a single load.
+    """
+    model = _models.get(model_id)
+    if model is not None:
+        return model
+    with _registry_lock:
+        lock = _load_locks.setdefault(model_id, threading.Lock())
+        loader = _loaders.get(model_id, _load_sentiment_pipeline)
+    with lock:
+        if model_id not in _models:
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            model = loader(model_id)
+            _stats[model_id] = {
+                "model": model_id,
+                "load_seconds": time.perf_counter() - start,
+                "rss_mb": max(_rss_bytes() - rss_before, 0) / 2**20,
+            }
+            _models[model_id] = model
+            print(f"Loaded {model_id} in {_stats[model_id]['load_seconds']:.2f}s "
+                  f"(+{_stats[model_id]['rss_mb']:.0f} MB resident)")
+        return _models[model_id]
+
+
+def _load_onnx_pipeline(key):
+    model_id = key.rsplit("@", 1)[0]
+    try:
+        from onnx_sentiment import OnnxSentimentPipeline
+
+        return OnnxSentimentPipeline(model_id)
+    except ImportError as e:
+        print(f"ONNX backend unavailable ({e}); using the PyTorch pipeline for {model_id}.")
+        return get_model(model_id)
+
+
+def get_sentiment_pipeline(model_id=SENTIMENT_MODEL, backend="torch"):
+    """
+    Shared sentiment pipeline. backend="onnx" serves the int8-quantized ONNX
+    Runtime export (needs onnxruntime) and falls back to PyTorch without it.
+    """
+    if backend == "onnx":
+        key = f"{model_id}@onnx-int8"
+        if key not in _loaders:
+            register_model(key, _load_onnx_pipeline)
+        return get_model(key)
+    return get_model(model_id)
+
+
+def get_vader():
+    return get_model(VADER_MODEL)
+
+
+def loaded_models():
+    """Load time and resident memory added by each model loaded so far."""
+    return [dict(stats) for stats in _stats.values()]
+
+
+def unload_model(model_id):
+    """Drop a model so the next get_model() loads it again."""
+    with _registry_lock:
+        _models.pop(model_id, None)
+        _stats.pop(model_id, None)
+
+
+register_model(VADER_MODEL, _load_vader)
+
+
+if __name__ == "__main__":
+    # Usage: python model_registry.py [model_id ...]
+    import sys
+
+    for model_id in sys.argv[1:] or [SENTIMENT_MODEL]:
+        get_model(model_id)
+        start = time.perf_counter()
+        get_model(model_id)
+        print(f"Second get_model({model_id!r}): {(time.perf_counter() - start) * 1e6:.1f} µs")
+    print(f"Process RSS: {_rss_bytes() / 2**20:.0f} MB")
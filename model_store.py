@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+MODEL_DIR = "model_store"
+# Older artifacts of a model beyond this many are deleted after each save
+KEEP_VERSIONS = 3
+RANDOM_FOREST_PARAMS = {"n_estimators": 100, "random_state": 42}
+
+_loaded = {}
+_pending = {}
+_lock = threading.Lock()
+# One background trainer; each fit already uses every core through n_jobs=-1
+_trainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-store")
+
+
+def training_fingerprint(X, y):
+    """Content hash of the training features and target, including their row index."""
+    hasher = hashlib.sha1()
+    hasher.update(pd.util.hash_pandas_object(pd.DataFrame(X), index=True).to_numpy().tobytes())
+    hasher.update(pd.util.hash_pandas_object(pd.Series(y), index=True).to_numpy().tobytes())
+    return hasher.hexdigest()
+
+
+def artifact_key(fingerprint, params):
+    payload = json.dumps({"data": fingerprint, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _model_dir(name, store_dir):
+    return os.path.join(store_dir, name)
+
+
+def _manifest_path(name, store_dir):
+    return os.path.join(_model_dir(name, store_dir), "manifest.json")
+
+
+def read_manifest(name, store_dir=MODEL_DIR):
+    """Saved versions of a model, oldest first (empty before the first save)."""
+    try:
+        with open(_manifest_path(name, store_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def _load(name, key, store_dir):
+    import joblib
+
+    with _lock:
+        model = _loaded.get((store_dir, name, key))
+    if model is None:
+        path = os.path.join(_model_dir(name, store_dir), key + ".joblib")
+        if not os.path.exists(path):
+            return None
+        # Large arrays are memory-mapped from the file instead of read through a buffer
+        model = joblib.load(path, mmap_mode="r")
+        with _lock:
+            _loaded[(store_dir, name, key)] = model
+    return model
+
+
+def save_model(name, model, key, fingerprint, params, n_rows, train_seconds, store_dir=MODEL_DIR):
+    """Write a new artifact version and drop all but the newest KEEP_VERSIONS."""
+    import joblib
+
+    directory = _model_dir(name, store_dir)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, key + ".joblib")
+    # Uncompressed so the arrays can be memory-mapped on load
+    joblib.dump(model, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+    with _lock:
+        versions = [v for v in read_manifest(name, store_dir) if v["key"] != key]
+        versions.append({
+            "key": key,
+            "fingerprint": fingerprint,
+            "params": params,
+            "n_rows": n_rows,
+            "train_seconds": round(train_seconds, 3),
+            "trained_at": datetime.now().isoformat(timespec="seconds"),
+        })
+        for old in versions[:-KEEP_VERSIONS]:
+            try:
+                os.remove(os.path.join(directory, old["key"] + ".joblib"))
+            except OSError:
+                pass
+            _loaded.pop((store_dir, name, old["key"]), None)
+        versions = versions[-KEEP_VERSIONS:]
+        manifest = _manifest_path(name, store_dir)
+        with open(manifest + ".tmp", "w") as f:
+            json.dump(versions, f, indent=2)
+        os.replace(manifest + ".tmp", manifest)
+
+
+def _train(name, key, fingerprint, params, n_rows, fit_fn, store_dir):
+    try:
+        start = time.perf_counter()
+        model = fit_fn()
+        save_model(name, model, key, fingerprint, params, n_rows, time.perf_counter() - start, store_dir)
+        with _lock:
+            _loaded[(store_dir, name, key)] = model
+        return model
+    finally:
+        with _lock:
+            _pending.pop((store_dir, name, key), None)
+
+
+def cached_model(name, X, y, params, fit_fn, background=True, store_dir=MODEL_DIR):
+    """
+    Return the stored model trained on exactly this (X, y) with these params,
+    or call fit_fn() to train one.
+
+    With background=True and an older version on disk, the older model is
+    returned right away while fit_fn() runs on the background trainer; the
+    next call picks up the new version. The first model of a name is always
+    trained in the foreground. Artifacts are loaded once per process.
+    """
+    fingerprint = training_fingerprint(X, y)
+    key = artifact_key(fingerprint, params)
+    model = _load(name, key, store_dir)
+    if model is not None:
+        return model
+
+    versions = read_manifest(name, store_dir)
+    previous = _load(name, versions[-1]["key"], store_dir) if versions else None
+    if previous is None or not background:
+        return _train(name, key, fingerprint, params, len(X), fit_fn, store_dir)
+
+    with _lock:
+        if (store_dir, name, key) not in _pending:
+            _pending[(store_dir, name, key)] = _trainer.submit(
+                _train, name, key, fingerprint, params, len(X), fit_fn, store_dir
+            )
+    return previous
+
+
+def wait_for_training(timeout=None):
+    """Block until the queued background retrains finish (used by scripts and tests)."""
+    with _lock:
+        futures = list(_pending.values())
+    for future in futures:
+        future.result(timeout=timeout)
+
+
+# Benchmark: retraining on every call vs loading the stored artifact
+def run_benchmark(n_rows=50_000):
+    import tempfile
+
+    import numpy as np
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"Price": rng.uniform(100, 5000, n_rows), "Discount": rng.uniform(0, 60, n_rows)})
+    y = X["Discount"] + (X["Price"] * 0.05).round(2)
+    params = dict(RANDOM_FOREST_PARAMS, max_depth=12)
+
+    start = time.perf_counter()
+    RandomForestRegressor(**params).fit(X, y)
+    print(f"Single-threaded fit: {time.perf_counter() - start:.2f}s")
+
+    store_dir = tempfile.mkdtemp()
+    start = time.perf_counter()
+    cached_model("benchmark", X, y, params, lambda: RandomForestRegressor(**params, n_jobs=-1).fit(X, y),
+                 store_dir=store_dir)
+    print(f"Fit on all cores ({os.cpu_count()}) and save: {time.perf_counter() - start:.2f}s")
+
+    _loaded.clear()
+    start = time.perf_counter()
+    cached_model("benchmark", X, y, params, None, store_dir=store_dir)
+    print(f"Memory-mapped load of the stored model: {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    cached_model("benchmark", X, y, params, None, store_dir=store_dir)
+    print(f"Lookup of the already loaded model: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,144 @@
+import hashlib
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# Arrow-backed strings keep the str.* operations in vectorized C++ kernels
+TEXT_DTYPE = "string[pyarrow]"
+
+NUMBER_PATTERN = r"(\d+(?:\.\d+)?)"
+PERCENT_PATTERN = r"(\d+(?:\.\d+)?)\s*%"
+PRICE_PATTERN = r"(\d[\d,]*(?:\.\d+)?)"
+READ_MORE_PATTERN = r"\s*Read more\s*$"
+
+
+def _as_text(values):
+    return pd.Series(values).astype(TEXT_DTYPE)
+
+
+def _to_float(values):
+    return pd.to_numeric(values, errors="coerce").astype("float64")
+
+
+def parse_price(values):
+    """'₹34,999.00' -> 34999.0"""
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype("float64")
+    amount = _as_text(values).str.extract(PRICE_PATTERN, expand=False)
+    return _to_float(amount.str.replace(",", "", regex=False))
+
+
+def parse_discount(values):
+    """'20% off', '-20%' or '20' -> 20.0"""
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype("float64").abs()
+    text = _as_text(values)
+    percent = _to_float(text.str.extract(PERCENT_PATTERN, expand=False))
+    plain = _to_float(text.str.strip()).abs()
+    return percent.fillna(plain)
+
+
+def parse_rating(values):
+    """'3.3 out of 5 stars' -> 3.3"""
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype("float64")
+    return _to_float(_as_text(values).str.extract(NUMBER_PATTERN, expand=False))
+
+
+def parse_count(values):
+    """'1,265 ratings' -> 1265.0"""
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype("float64")
+    return _to_float(_as_text(values).str.replace(",", "", regex=False).str.extract(r"(\d+)", expand=False))
+
+
+def normalize_review_text(values):
+    """Drop the scraped 'Read more' tail and collapse whitespace."""
+    text = _as_text(values)
+    text = text.str.replace(READ_MORE_PATTERN, "", regex=True)
+    return text.str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def hash_review_text(values):
+    """Content hash of each normalized review (None for missing text)."""
+    normalized = normalize_review_text(values)
+    hashes = [
+        hashlib.sha1(text.encode("utf-8")).hexdigest() if isinstance(text, str) and text else None
+        for text in normalized.tolist()
+    ]
+    return pd.Series(hashes, index=normalized.index, dtype=object)
+
+
+# Scraped columns (across app.py, SCRAEP.py and APP.py naming) and their parsers
+FIELD_PARSERS = {
+    "price": parse_price,
+    "Price": parse_price,
+    "mrp": parse_price,
+    "selling price": parse_price,
+    "original price": parse_price,
+    "discount": parse_discount,
+    "Discount": parse_discount,
+    "rating": parse_rating,
+    "reviews": parse_count,
+}
+
+
+def normalize_scraped(df):
+    """
+    Parse the raw scraped strings into typed float columns in one pass.
+    Already-numeric columns are left as they are, so this is safe to call twice.
+    """
+    df = df.copy()
+    for column, parser in FIELD_PARSERS.items():
+        if column in df.columns:
+            df[column] = parser(df[column]).to_numpy()
+    return df
+
+
+# Benchmark against row-by-row parsing on a synthetic table
+def run_benchmark(n_rows=1_000_000):
+    rng = np.random.default_rng(42)
+    prices = rng.integers(100, 200_000, n_rows)
+    df = pd.DataFrame({
+        "price": [f"₹{p:,}.00" for p in prices],
+        "discount": [f"{d}% off" for d in rng.integers(0, 80, n_rows)],
+        "rating": [f"{r:.1f} out of 5 stars" for r in rng.uniform(1, 5, n_rows)],
+        "reviews": [f"{c:,} ratings" for c in rng.integers(0, 50_000, n_rows)],
+    })
+
+    def parse_row(row):
+        def first_number(text, pattern=NUMBER_PATTERN):
+            match = re.search(pattern, text)
+            return float(match.group(1)) if match else np.nan
+        return pd.Series({
+            "price": first_number(row["price"].replace(",", "")),
+            "discount": first_number(row["discount"], PERCENT_PATTERN),
+            "rating": first_number(row["rating"]),
+            "reviews": first_number(row["reviews"].replace(",", ""), r"(\d+)"),
+        })
+
+    sample = df.head(100_000)
+    start = time.perf_counter()
+    row_wise = sample.apply(parse_row, axis=1)
+    row_time = (time.perf_counter() - start) * n_rows / len(sample)
+
+    start = time.perf_counter()
+    typed = normalize_scraped(df)
+    vector_time = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(typed.head(len(sample)), row_wise, check_dtype=False)
+    print(f"Rows: {n_rows:,}")
+    print(f"Row-by-row apply (extrapolated from {len(sample):,} rows): {n_rows / row_time:,.0f} rows/s")
+    print(f"Vectorized normalize_scraped: {n_rows / vector_time:,.0f} rows/s")
+    print(f"Speedup: {row_time / vector_time:.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
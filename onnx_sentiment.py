@@ -0,0 +1,162 @@
+import os
+import time
+
+import numpy as np
+
+from sentiment import MAX_TOKENS, SENTIMENT_MODEL
+
+
+ONNX_DIR = "onnx_models"
+QUANTIZED_FILE = "model.int8.onnx"
+
+
+def onnx_model_dir(model_id, onnx_dir=ONNX_DIR):
+    return os.path.join(onnx_dir, model_id.strip("/").replace("/", "__"))
+
+
+def export_quantized(model_id=SENTIMENT_MODEL, onnx_dir=ONNX_DIR):
+    """
+    Export a sequence-classification model to ONNX and apply int8 dynamic
+    quantization. The tokenizer and config are saved next to the model.
+    Returns the output directory; an existing export is reused.
+    """
+    output_dir = onnx_model_dir(model_id, onnx_dir)
+    quantized_path = os.path.join(output_dir, QUANTIZED_FILE)
+    if os.path.exists(quantized_path):
+        return output_dir
+
+    import shutil
+    import tempfile
+
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    # Build in a private staging directory and move the files in, the quantized model last,
+    # so concurrent exports never read or delete each other's files
+    os.makedirs(output_dir, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(dir=output_dir, prefix=".export-")
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(model_id)
+        model = AutoModelForSequenceClassification.from_pretrained(model_id).eval()
+        tokenizer.save_pretrained(staging_dir)
+        model.config.save_pretrained(staging_dir)
+
+        float_path = os.path.join(staging_dir, "model.onnx")
+        sample = tokenizer(["an example review"], return_tensors="pt")
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (sample["input_ids"], sample["attention_mask"]),
+                float_path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["logits"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "logits": {0: "batch"},
+                },
+                opset_version=17,
+                dynamo=False,
+            )
+        quantize_dynamic(float_path, os.path.join(staging_dir, QUANTIZED_FILE), weight_type=QuantType.QInt8)
+        os.remove(float_path)
+        names = sorted(os.listdir(staging_dir), key=lambda name: name == QUANTIZED_FILE)
+        for name in names:
+            os.replace(os.path.join(staging_dir, name), os.path.join(output_dir, name))
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    return output_dir
+
+
+class _ModelInfo:
+    """Stands in for pipeline.model so callers can read name_or_path."""
+
+    def __init__(self, name_or_path):
+        self.name_or_path = name_or_path
+
+
+class OnnxSentimentPipeline:
+    """
+    Quantized ONNX Runtime replacement for pipeline("sentiment-analysis").
+
+    Called with a string or a list of strings, it returns the same
+    [{"label": ..., "score": ...}] results as the transformers pipeline.
+    """
+
+    def __init__(self, model_id=SENTIMENT_MODEL, onnx_dir=ONNX_DIR, threads=None):
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoTokenizer
+
+        model_dir = export_quantized(model_id, onnx_dir)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.labels = AutoConfig.from_pretrained(model_dir).id2label
+        # The cache key includes the backend so int8 results never mix with the fp32 ones
+        self.model = _ModelInfo(f"{model_id}@onnx-int8")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(os.path.join(model_dir, QUANTIZED_FILE), options,
+                                            providers=["CPUExecutionProvider"])
+
+    def __call__(self, texts, batch_size=None, truncation=True, max_length=MAX_TOKENS):
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        batch_size = batch_size or len(texts) or 1
+        results = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(texts[start:start + batch_size], padding=True, truncation=truncation,
+                                     max_length=max_length, return_tensors="np")
+            logits = self.session.run(["logits"], {
+                "input_ids": encoded["input_ids"].astype(np.int64),
+                "attention_mask": encoded["attention_mask"].astype(np.int64),
+            })[0]
+            # Softmax, as the transformers pipeline applies for single-label models
+            probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probs /= probs.sum(axis=1, keepdims=True)
+            best = probs.argmax(axis=1)
+            results.extend({"label": self.labels[int(i)], "score": float(probs[row, i])}
+                           for row, i in enumerate(best))
+        return results
+
+
+# Agreement and latency against the PyTorch pipeline on CPU
+def run_benchmark(model_id=SENTIMENT_MODEL, n_reviews=512, batch_size=32):
+    from transformers import pipeline
+
+    from sentiment import score_reviews
+
+    rng = np.random.default_rng(0)
+    words = ("great sound battery poor delivery value fast broke comfortable cheap "
+             "excellent awful quality love hate bass noise works fine returned").split()
+    reviews = [" ".join(rng.choice(words, rng.integers(5, 120))) for _ in range(n_reviews)]
+
+    torch_pipeline = pipeline("sentiment-analysis", model=model_id, device=-1)
+    onnx_pipeline = OnnxSentimentPipeline(model_id)
+
+    timings = {}
+    labels = {}
+    for name, analyzer in (("PyTorch fp32", torch_pipeline), ("ONNX int8", onnx_pipeline)):
+        analyzer(reviews[:batch_size], batch_size=batch_size, truncation=True)  # warm-up
+        start = time.perf_counter()
+        for review in reviews[:64]:
+            analyzer(review, truncation=True, max_length=MAX_TOKENS)
+        single = (time.perf_counter() - start) / 64
+        start = time.perf_counter()
+        labels[name], _ = score_reviews(reviews, analyzer, batch_size)
+        timings[name] = (single, time.perf_counter() - start)
+        print(f"{name}: {single * 1000:.1f} ms/review single, "
+              f"{n_reviews / timings[name][1]:.1f} reviews/s batched")
+
+    agreement = (labels["PyTorch fp32"] == labels["ONNX int8"]).mean()
+    print(f"Speedup: {timings['PyTorch fp32'][1] / timings['ONNX int8'][1]:.1f}x batched, "
+          f"{timings['PyTorch fp32'][0] / timings['ONNX int8'][0]:.1f}x single")
+    print(f"Label agreement with PyTorch: {agreement:.1%}")
+    return agreement
+
+
+if __name__ == "__main__":
+    # Usage: python onnx_sentiment.py [model_id]
+    import sys
+
+    run_benchmark(sys.argv[1] if len(sys.argv) > 1 else SENTIMENT_MODEL)
@@ -0,0 +1,230 @@
+import re
+import time
+
+import lxml.etree
+import lxml.html
+
+
+# Field selectors, compiled once into lookup tables.
+# Exact matches compare the whole class attribute, token matches any single class
+# (the same semantics as soup.find(..., attrs={"class": ...})).
+EXACT_CLASS_FIELDS = {
+    "a-size-medium a-color-base a-text-normal": "title",
+    "a-price a-text-price": "mrp",
+    "a-size-base review-text": "review_statements",
+}
+CLASS_TOKEN_FIELDS = {
+    "a-price-whole": "price",
+    "a-icon-alt": "rating",
+    "a-size-base": "reviews",
+}
+AVAILABILITY_ID = "availability"
+DISCOUNT_MARKER = "off"
+
+FIELD_DEFAULTS = {
+    "title": "",
+    "price": "",
+    "mrp": "",
+    "discount": "",
+    "rating": "",
+    "reviews": "",
+    "review_statements": "",
+    "availability": "Not Available",
+}
+RENDERED_DEFAULTS = {"selling price": 0, "original price": 0, "discount": 0, "rating": 0, "review": ""}
+
+
+# XPaths SCRAEP.py reads from the Selenium-rendered page
+RENDERED_XPATHS = {
+    "selling price": '//*[@id="corePriceDisplay_desktop_feature_div"]/div[1]/span[3]/span[2]/span[2]',
+    "original price": '//*[@id="corePriceDisplay_desktop_feature_div"]/div[2]/span/span[1]/span[2]/span/span[2]',
+    "discount": '//*[@id="corePriceDisplay_desktop_feature_div"]/div[1]/span[2]',
+    "rating": '//*[@id="acrPopover"]/span[1]/a/span',
+    "review": "//*[@id='product-summary']/p/span",
+}
+
+
+# Function to parse raw page content with the lxml (C) parser (None for an empty page)
+def parse_document(content):
+    if isinstance(content, bytes):
+        try:
+            content = content.decode("utf-8")
+        except UnicodeDecodeError:
+            pass  # Let lxml detect the encoding from the page
+    try:
+        return lxml.html.document_fromstring(content)
+    except lxml.etree.ParserError:
+        # Empty or whitespace-only body
+        return None
+
+
+# Function to mirror BeautifulSoup's Tag.string (only set for a single text child)
+def single_string(element):
+    while len(element) == 1 and not element.text and not element[0].tail:
+        element = element[0]
+    if len(element) == 0 and not callable(element.tag):
+        return element.text or ""
+    return None
+
+
+def get_offscreen_text(element):
+    for span in element.iter("span"):
+        if "a-offscreen" in (span.get("class") or "").split():
+            return span.text_content().strip()
+    return ""
+
+
+def extract_product_fields(content):
+    """
+    Extract every product field in one pass over the page body.
+    Returns FIELD_DEFAULTS for a blank page.
+    """
+    root = parse_document(content)
+    if root is None:
+        return dict(FIELD_DEFAULTS)
+    body = root.find("body")
+    if body is None:
+        body = root
+
+    fields = {}
+    for element in body.iter("span", "div"):
+        if element.tag == "div":
+            if "availability" not in fields and element.get("id") == AVAILABILITY_ID:
+                fields["availability"] = element.text_content().strip()
+            continue
+
+        class_attr = element.get("class")
+        if class_attr:
+            tokens = class_attr.split()
+            field = EXACT_CLASS_FIELDS.get(" ".join(tokens))
+            if field and field not in fields:
+                if field == "mrp":
+                    fields[field] = get_offscreen_text(element)
+                else:
+                    fields[field] = element.text_content().strip()
+            for token in tokens:
+                field = CLASS_TOKEN_FIELDS.get(token)
+                if field and field not in fields:
+                    fields[field] = element.text_content().strip()
+
+        if "discount" not in fields:
+            string = single_string(element)
+            if string and DISCOUNT_MARKER in string:
+                fields["discount"] = element.text_content().strip()
+
+        if len(fields) == len(FIELD_DEFAULTS):
+            break
+
+    return {key: fields.get(key, default) for key, default in FIELD_DEFAULTS.items()}
+
+
+def _inner_html(element):
+    return (element.text or "") + "".join(
+        lxml.html.tostring(child, encoding="unicode", with_tail=True) for child in element
+    )
+
+
+def extract_rendered_fields(content):
+    """
+    Offline version of SCRAEP.py's XPath extraction for an archived
+    Selenium page_source. Returns SCRAEP's product_data fields, with the
+    review as a string ("" when missing).
+    """
+    root = parse_document(content)
+    if root is None:
+        return dict(RENDERED_DEFAULTS)
+
+    def first(field):
+        found = root.xpath(RENDERED_XPATHS[field])
+        return found[0] if found else None
+
+    fields = dict(RENDERED_DEFAULTS)
+    element = first("selling price")
+    if element is not None:
+        digits = "".join(element.text_content().strip().split(","))
+        fields["selling price"] = int(digits) if digits.isdigit() else 0
+    element = first("original price")
+    if element is not None:
+        digits = re.sub(r"[^\d]", "", element.text_content())
+        fields["original price"] = int(digits) if digits else 0
+    element = first("discount")
+    if element is not None:
+        # Like SCRAEP.py: this slot holds the rating on some layouts
+        text = _inner_html(element).strip()
+        if " out of 5 stars" in text.lower():
+            fields["rating"] = text.lower().split(" out of")[0].strip()
+        else:
+            fields["discount"] = text
+    element = first("rating")
+    if element is not None:
+        fields["rating"] = element.text_content().strip()
+    element = first("review")
+    if element is not None:
+        fields["review"] = element.text_content().strip()
+    return fields
+
+
+# Benchmark against the per-field soup.find extractors on a synthetic product page
+def run_benchmark(n_pages=200, filler_blocks=400):
+    import re
+    from bs4 import BeautifulSoup
+
+    def legacy_extract(content):
+        soup = BeautifulSoup(content, "html.parser")
+
+        def text_of(tag, default=""):
+            return tag.text.strip() if tag else default
+
+        mrp = soup.find("span", attrs={"class": "a-price a-text-price"})
+        mrp_span = mrp.find("span", attrs={"class": "a-offscreen"}) if mrp else None
+        return {
+            "title": text_of(soup.find("span", attrs={"class": "a-size-medium a-color-base a-text-normal"})),
+            "price": text_of(soup.find("span", attrs={"class": "a-price-whole"})),
+            "mrp": text_of(mrp_span),
+            "discount": text_of(soup.find("span", string=re.compile(r"off"))),
+            "rating": text_of(soup.find("span", attrs={"class": "a-icon-alt"})),
+            "reviews": text_of(soup.find("span", attrs={"class": "a-size-base"})),
+            "review_statements": text_of(soup.find("span", attrs={"class": "a-size-base review-text"})),
+            "availability": text_of(soup.find("div", attrs={"id": "availability"}), "Not Available"),
+        }
+
+    filler = "".join(
+        f'<div class="a-row"><span class="a-text-bold">Feature {i}</span>'
+        f'<a href="/dp/{i}"><span>Link {i}</span></a></div>'
+        for i in range(filler_blocks)
+    )
+    page = (
+        "<html><head><title>Product</title><script>var x = 1;</script></head><body>"
+        + filler
+        + '<span class="a-size-medium a-color-base a-text-normal"> Sony WH-1000XM5 </span>'
+        + '<span class="a-price-whole">29,990</span>'
+        + '<span class="a-price a-text-price"><span class="a-offscreen">₹34,990</span></span>'
+        + "<span>(14% off)</span>"
+        + '<span class="a-icon-alt">4.4 out of 5 stars</span>'
+        + '<span class="a-size-base" id="acrCustomerReviewText">1,234 ratings</span>'
+        + '<span class="a-size-base review-text">Great noise cancelling.</span>'
+        + '<div id="availability"> In stock </div>'
+        + filler
+        + "</body></html>"
+    ).encode("utf-8")
+
+    assert extract_product_fields(page) == legacy_extract(page)
+
+    start = time.perf_counter()
+    for _ in range(n_pages):
+        legacy_extract(page)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(n_pages):
+        extract_product_fields(page)
+    single_pass_time = time.perf_counter() - start
+
+    print(f"Pages: {n_pages} x {len(page) / 1024:.0f} KB")
+    print(f"html.parser + per-field soup.find: {n_pages / legacy_time:.1f} pages/s")
+    print(f"lxml single-pass extractor: {n_pages / single_pass_time:.1f} pages/s")
+    print(f"Speedup: {legacy_time / single_pass_time:.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
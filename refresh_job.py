@@ -0,0 +1,58 @@
+import argparse
+import time
+
+from feature_store import refresh_features
+from forecast_store import FORECAST_DAYS, precompute_forecasts
+from sentiment_aggregates import refresh_daily_sentiment
+from sentiment_cascade import AMBIGUOUS_BAND, cascade_model_id, cascade_sentiment
+from sql_store import connect
+
+# The cascade aggregates SCRAEP.py and APP.py chart, and the VADER ones app.py charts
+CASCADE_MODEL_ID = cascade_model_id(AMBIGUOUS_BAND)
+VADER_MODEL_ID = "vader"
+
+
+def score_cascade(texts):
+    """VADER-first cascade: only reviews inside AMBIGUOUS_BAND reach the transformer."""
+    from model_registry import get_sentiment_pipeline
+
+    labels, scores, _ = cascade_sentiment(texts, AMBIGUOUS_BAND, analyzer=get_sentiment_pipeline())
+    return labels, scores
+
+
+def score_vader(texts):
+    from vader_sentiment import score_vader as score
+
+    return score(texts)
+
+
+SENTIMENT_SCORERS = {CASCADE_MODEL_ID: score_cascade, VADER_MODEL_ID: score_vader}
+
+
+def run_refresh(conn, days=FORECAST_DAYS, workers=None, sentiment_models=tuple(SENTIMENT_SCORERS)):
+    """
+    Fold new snapshots into the model features, refit and store every
+    product's forecasts, then score new reviews into the daily sentiment
+    aggregates of each model in `sentiment_models`.
+    """
+    start = time.perf_counter()
+    written = refresh_features(conn)
+    print(f"Refreshed features for {written} new days in {time.perf_counter() - start:.1f}s")
+    start = time.perf_counter()
+    precompute_forecasts(conn, days=days, workers=workers)
+    print(f"Precomputed forecasts in {time.perf_counter() - start:.1f}s")
+    for model_id in sentiment_models:
+        start = time.perf_counter()
+        processed = refresh_daily_sentiment(conn, model_id, SENTIMENT_SCORERS[model_id])
+        print(f"Scored {processed} new reviews for {model_id} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Offline refresh of the stored features, forecasts and sentiment aggregates the dashboards read.")
+    parser.add_argument("--workers", type=int, default=None, help="Forecast worker processes (default: all cores).")
+    parser.add_argument("--days", type=int, default=FORECAST_DAYS, help="Forecast horizon in days.")
+    parser.add_argument("--sentiment-models", nargs="*", default=list(SENTIMENT_SCORERS),
+                        choices=list(SENTIMENT_SCORERS), help="Sentiment aggregates to refresh (default: all).")
+    args = parser.parse_args()
+    run_refresh(connect(), days=args.days, workers=args.workers, sentiment_models=args.sentiment_models)
@@ -17,6 +17,10 @@ Original file is located at
 
 !pip install pandas
 
+!pip install aiohttp
+
+!pip install lxml
+
 """**Actual work week 1** - *webscrapping of amazon data*"""
 
 from bs4 import BeautifulSoup
@@ -307,87 +311,12 @@ if __name__ == '__main__':
 
 from bs4 import BeautifulSoup
 import requests
-import re
 import datetime
 import pandas as pd
 import numpy as np
-
-
-# Function to extract Product Title
-def get_title(soup):
-    try:
-        title = soup.find("span", attrs={"class": "a-size-medium a-color-base a-text-normal"})
-        return title.text.strip() if title else ""
-    except AttributeError:
-        return ""
-
-
-# Function to extract price
-def get_price(soup):
-    try:
-        price = soup.find("span", attrs={"class": "a-price-whole"})
-        return price.text.strip() if price else ""
-    except AttributeError:
-        return ""
-
-
-# Function to extract MRP
-def get_mrp(soup):
-    try:
-        mrp = soup.find("span", attrs={"class": "a-price a-text-price"})
-        if mrp:
-            mrp_span = mrp.find("span", attrs={"class": "a-offscreen"})
-            return mrp_span.text.strip() if mrp_span else ""
-    except AttributeError:
-        return ""
-    return ""
-
-
-# Function to get product discount (e.g., "20% off")
-def get_discount(soup):
-    try:
-        discount = soup.find("span", string=re.compile(r"off"))
-        return discount.text.strip() if discount else ""
-    except AttributeError:
-        return ""
-
-
-# Function to extract Product Rating
-def get_rating(soup):
-    try:
-        rating = soup.find("span", attrs={"class": "a-icon-alt"})
-        return rating.text.strip() if rating else ""
-    except AttributeError:
-        return ""
-
-
-# Function to extract Number of User Reviews
-def get_review_count(soup):
-    try:
-        review_count = soup.find("span", attrs={"class": "a-size-base"}).text
-        return review_count.strip() if review_count else ""
-    except AttributeError:
-        return ""
-
-
-# Function to extract review statements
-def get_review(soup):
-    try:
-        review = soup.find("span", attrs={"class": "a-size-base review-text"})
-        return review.text.strip() if review else ""
-    except AttributeError:
-        return ""
-
-
-# Function to extract Availability Status
-def get_availability(soup):
-    try:
-        available = soup.find("div", attrs={"id": "availability"})
-        if available:
-            return available.text.strip()
-    except AttributeError:
-        return "Not Available"
-    return "Not Available"
+from async_fetch import fetch_pages
+from page_extractor import extract_product_fields
+from html_archive import ARCHIVE_DIR
 
 
 # Function to fetch page content
@@ -443,19 +372,17 @@ if __name__ == "__main__":
         "date": [],
     }
 
-    # Loop through product links to extract data
-    for link in product_links:
-        print(f"Fetching data for product: {link}")
-        product_soup = fetch_page_content(link, HEADERS)
-        if product_soup:
-            data["title"].append(get_title(product_soup))
-            data["price"].append(get_price(product_soup))
-            data["mrp"].append(get_mrp(product_soup))
-            data["discount"].append(get_discount(product_soup))
-            data["rating"].append(get_rating(product_soup))
-            data["reviews"].append(get_review_count(product_soup))
-            data["review_statements"].append(get_review(product_soup))
-            data["availability"].append(get_availability(product_soup))
+    # Fetch all product pages concurrently over a pooled keep-alive client
+    print(f"Fetching data for {len(product_links)} products...")
+    # Each page is parsed once with lxml and all fields are pulled in a single pass.
+    # Raw pages are archived so broken selectors can be fixed with `python html_archive.py --replay`
+    product_pages = fetch_pages(product_links, HEADERS, parse=extract_product_fields, archive_dir=ARCHIVE_DIR)
+
+    # Loop through extracted pages to collect data
+    for link, product_fields in zip(product_links, product_pages):
+        if product_fields:
+            for key, value in product_fields.items():
+                data[key].append(value)
 
             current_date = datetime.datetime.now().strftime("%Y-%m-%d")
             data["date"].append(current_date)
@@ -487,17 +414,21 @@ review_statements.to_csv("review_statements.csv", index=False, encoding='utf-8')
 """**Sentiment Analysis**"""
 
 import pandas as pd
-from transformers import pipeline
 import matplotlib.pyplot as plt
 from IPython.display import display  # Import the display function
+from sentiment import SENTIMENT_BATCH_SIZE, add_sentiment_columns
+from sentiment_cache import get_cache
+from model_registry import get_sentiment_pipeline, loaded_models
 
-# Specify the model explicitly
-sentiment_analyzer = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
+# Specify the model explicitly; the registry loads it on first use and shares it process-wide
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+# "torch" or "onnx" (int8-quantized ONNX Runtime export; needs onnxruntime and onnx)
+SENTIMENT_BACKEND = "torch"
 
 def get_sentiment(text):
     """Analyze sentiment of the given text using Hugging Face sentiment analysis"""
     try:
-        result = sentiment_analyzer(text)
+        result = get_sentiment_pipeline(SENTIMENT_MODEL, SENTIMENT_BACKEND)(text)
         sentiment = result[0]["label"]
         score = result[0]["score"]
         return sentiment, score
@@ -514,10 +445,12 @@ def preprocess_review_data(file_path):
 def main(file_path, output_path):
     review_data = preprocess_review_data(file_path)
 
-    # Extract sentiment and scores
-    sentiments = review_data["review_statements"].apply(get_sentiment)
-    review_data["Sentiment"] = sentiments.apply(lambda x: x[0])
-    review_data["SentimentScore"] = sentiments.apply(lambda x: x[1])
+    # Extract sentiment and scores in length-bucketed batches, skipping reviews scored on earlier runs
+    sentiment_cache = get_cache()
+    review_data = add_sentiment_columns(review_data, get_sentiment_pipeline(SENTIMENT_MODEL, SENTIMENT_BACKEND),
+                                        batch_size=SENTIMENT_BATCH_SIZE, cache=sentiment_cache)
+    print(f"Sentiment cache: {sentiment_cache.stats()}")
+    print(f"Loaded models: {loaded_models()}")
 
     # Save the processed data to a CSV file
     review_data.to_csv(output_path, index=False)
@@ -535,17 +468,21 @@ if __name__ == "__main__":
 """**Sentiment score distribution** - *trend lines*"""
 
 import pandas as pd
-from transformers import pipeline
 import matplotlib.pyplot as plt
 import seaborn as sns
+from sentiment import SENTIMENT_BATCH_SIZE, add_sentiment_columns
+from sentiment_cache import get_cache
+from model_registry import get_sentiment_pipeline, loaded_models
 
-# Sentiment analysis pipeline
-sentiment_analyzer = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
+# Sentiment analysis pipeline (loaded once by the registry on first use)
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+# "torch" or "onnx" (int8-quantized ONNX Runtime export; needs onnxruntime and onnx)
+SENTIMENT_BACKEND = "torch"
 
 def get_sentiment(text):
     """Analyze sentiment of the given text using Hugging Face sentiment analysis."""
     try:
-        result = sentiment_analyzer(text)
+        result = get_sentiment_pipeline(SENTIMENT_MODEL, SENTIMENT_BACKEND)(text)
         sentiment = result[0]["label"]
         score = result[0]["score"]
         return sentiment, score
@@ -592,10 +529,12 @@ def main(input_file, output_file):
     # Load and preprocess data
     review_data = preprocess_review_data(input_file)
 
-    # Extract sentiment and scores
-    sentiments = review_data["review_statements"].apply(get_sentiment)
-    review_data["Sentiment"] = sentiments.apply(lambda x: x[0])
-    review_data["SentimentScore"] = sentiments.apply(lambda x: x[1])
+    # Extract sentiment and scores in length-bucketed batches, skipping reviews scored on earlier runs
+    sentiment_cache = get_cache()
+    review_data = add_sentiment_columns(review_data, get_sentiment_pipeline(SENTIMENT_MODEL, SENTIMENT_BACKEND),
+                                        batch_size=SENTIMENT_BATCH_SIZE, cache=sentiment_cache)
+    print(f"Sentiment cache: {sentiment_cache.stats()}")
+    print(f"Loaded models: {loaded_models()}")
 
     # Generate summary statistics
     summary = generate_summary(review_data)
@@ -0,0 +1,115 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from sentiment_cache import cached_sentiment
+
+
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+SENTIMENT_BATCH_SIZE = 32
+MAX_TOKENS = 512
+
+# Label and score used when a review cannot be scored (same as get_sentiment)
+FALLBACK_SENTIMENT = ("Neutral", 0.0)
+
+
+def _score_one(analyzer, text):
+    try:
+        result = analyzer(text, truncation=True, max_length=MAX_TOKENS)
+        return result[0]["label"], result[0]["score"]
+    except Exception as e:
+        print(f"Error analyzing sentiment for text: {text}. Error: {e}")
+        return FALLBACK_SENTIMENT
+
+
+def iter_sentiment_batches(texts, analyzer, batch_size=SENTIMENT_BATCH_SIZE):
+    """
+    Score reviews through a transformers pipeline in length-bucketed batches.
+
+    Reviews are sorted by token length so each batch pads to a similar
+    length. Yields (positions, labels, scores) for every batch, where
+    positions index into `texts`.
+    """
+    texts = list(texts)
+    valid = [i for i, text in enumerate(texts) if isinstance(text, str)]
+    invalid = [i for i, text in enumerate(texts) if not isinstance(text, str)]
+    if invalid:
+        yield invalid, [FALLBACK_SENTIMENT[0]] * len(invalid), [FALLBACK_SENTIMENT[1]] * len(invalid)
+    if not valid:
+        return
+
+    encoded = analyzer.tokenizer([texts[i] for i in valid], truncation=True, max_length=MAX_TOKENS)
+    lengths = np.array([len(ids) for ids in encoded["input_ids"]])
+    ordered = [valid[i] for i in np.argsort(lengths, kind="stable")]
+
+    for start in range(0, len(ordered), batch_size):
+        positions = ordered[start:start + batch_size]
+        batch = [texts[i] for i in positions]
+        try:
+            results = analyzer(batch, batch_size=len(batch), truncation=True, max_length=MAX_TOKENS)
+            labels = [result["label"] for result in results]
+            scores = [result["score"] for result in results]
+        except Exception as e:
+            # Fall back to one-by-one scoring so a single bad review does not sink the batch
+            print(f"Batch of {len(batch)} reviews failed ({e}); scoring individually.")
+            labels, scores = zip(*[_score_one(analyzer, text) for text in batch])
+        yield positions, list(labels), list(scores)
+
+
+def score_reviews(texts, analyzer, batch_size=SENTIMENT_BATCH_SIZE):
+    """Return (labels, scores) NumPy arrays in the input order."""
+    texts = list(texts)
+    labels = np.empty(len(texts), dtype=object)
+    scores = np.zeros(len(texts), dtype="float64")
+    for positions, batch_labels, batch_scores in iter_sentiment_batches(texts, analyzer, batch_size):
+        labels[positions] = batch_labels
+        scores[positions] = batch_scores
+    return labels, scores
+
+
+def add_sentiment_columns(review_data, analyzer, text_column="review_statements", batch_size=SENTIMENT_BATCH_SIZE,
+                          cache=None):
+    """
+    Fill the Sentiment and SentimentScore columns batch by batch.
+    With a SentimentCache only reviews it has not seen reach the model.
+    """
+    review_data = review_data.copy()
+    texts = review_data[text_column].tolist()
+    if cache is None:
+        labels, scores = score_reviews(texts, analyzer, batch_size)
+    else:
+        model_id = getattr(analyzer.model, "name_or_path", SENTIMENT_MODEL)
+        labels, scores = cached_sentiment(texts, model_id, lambda batch: score_reviews(batch, analyzer, batch_size), cache)
+    review_data["Sentiment"] = labels
+    review_data["SentimentScore"] = scores
+    return review_data
+
+
+# Benchmark against the per-row apply(get_sentiment) path on CPU
+def run_benchmark(n_reviews=512, batch_size=SENTIMENT_BATCH_SIZE):
+    from transformers import pipeline
+
+    analyzer = pipeline("sentiment-analysis", model=SENTIMENT_MODEL, device=-1)
+    rng = np.random.default_rng(0)
+    words = ("great sound battery poor delivery value fast broke comfortable cheap "
+             "excellent awful quality love hate bass noise works fine returned").split()
+    reviews = pd.Series([" ".join(rng.choice(words, rng.integers(5, 120))) for _ in range(n_reviews)])
+
+    start = time.perf_counter()
+    per_row = reviews.apply(lambda text: _score_one(analyzer, text))
+    per_row_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    labels, scores = score_reviews(reviews, analyzer, batch_size)
+    batched_time = time.perf_counter() - start
+
+    agreement = (per_row.apply(lambda x: x[0]).to_numpy() == labels).mean()
+    print(f"Reviews: {n_reviews}, batch size: {batch_size}")
+    print(f"Per-row apply: {n_reviews / per_row_time:.1f} reviews/s")
+    print(f"Length-bucketed batches: {n_reviews / batched_time:.1f} reviews/s")
+    print(f"Speedup: {per_row_time / batched_time:.1f}x, label agreement: {agreement:.1%}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+from sentiment_cache import cached_sentiment
+from sql_store import attach_review_text
+
+LABEL_COLUMNS = ["positive", "negative", "neutral"]
+ROLLING_WINDOWS = {"rolling_7d": "7D", "rolling_30d": "30D"}
+# Days after a changed day whose rolling averages include it
+ROLLING_REACH = pd.Timedelta(days=29)
+
+
+def signed_scores(labels, scores):
+    """Sentiment on one scale: +score for positive, -score for negative, 0 for neutral."""
+    labels = pd.Series(labels, dtype=object).astype(str).str.upper().to_numpy()
+    scores = np.abs(np.asarray(scores, dtype="float64"))
+    return np.select([labels == "POSITIVE", labels == "NEGATIVE"], [scores, -scores], default=0.0)
+
+
+def _daily_counts(scored):
+    """(product, date) rows with per-label counts and the sum of signed scores."""
+    label = scored["label"].astype(str).str.upper()
+    counts = pd.DataFrame({
+        "product_name": scored["product_name"],
+        "date": scored["date"],
+        "positive": (label == "POSITIVE").astype(int),
+        "negative": (label == "NEGATIVE").astype(int),
+        "neutral": (~label.isin(["POSITIVE", "NEGATIVE"])).astype(int),
+        "total": 1,
+        "score_sum": signed_scores(scored["label"], scored["score"]),
+    })
+    return counts.groupby(["product_name", "date"], as_index=False).sum()
+
+
+def _refresh_rolling(conn, model_id, product, first_date, last_date):
+    """Recompute mean and rolling averages for the days whose windows cover the changed days."""
+    first = pd.Timestamp(first_date)
+    last = pd.Timestamp(last_date) + ROLLING_REACH
+    daily = pd.read_sql_query(
+        "SELECT date, total, score_sum FROM sentiment_daily "
+        "WHERE model_id = ? AND product_name = ? AND date >= ? AND date <= ? ORDER BY date",
+        conn,
+        params=[model_id, product, (first - ROLLING_REACH).strftime("%Y-%m-%d"), last.strftime("%Y-%m-%d")],
+    )
+    daily["date"] = pd.to_datetime(daily["date"])
+    daily = daily.set_index("date")
+    daily["mean_score"] = daily["score_sum"] / daily["total"]
+    for column, window in ROLLING_WINDOWS.items():
+        # Review-weighted average over the calendar window
+        rolled = daily[["score_sum", "total"]].rolling(window).sum()
+        daily[column] = rolled["score_sum"] / rolled["total"]
+    daily = daily[daily.index >= first]
+    conn.executemany(
+        "UPDATE sentiment_daily SET mean_score = ?, rolling_7d = ?, rolling_30d = ? "
+        "WHERE model_id = ? AND product_name = ? AND date = ?",
+        [(row.mean_score, row.rolling_7d, row.rolling_30d, model_id, product, date.strftime("%Y-%m-%d"))
+         for date, row in daily.iterrows()],
+    )
+
+
+def add_scored_reviews(conn, model_id, scored, last_rowid=None):
+    """
+    Fold scored reviews (product_name, date, label, score) into sentiment_daily.
+    Only the days that received reviews, and the rolling windows that cover
+    them, are touched. With last_rowid, the model's sentiment_progress
+    watermark moves in the same transaction, so a crash cannot count a batch twice.
+    """
+    counts = _daily_counts(scored) if not scored.empty else scored
+    with conn:
+        if not counts.empty:
+            conn.executemany(
+                "INSERT INTO sentiment_daily (model_id, product_name, date, positive, negative, neutral, total, score_sum) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (model_id, product_name, date) DO UPDATE SET "
+                "positive = positive + excluded.positive, negative = negative + excluded.negative, "
+                "neutral = neutral + excluded.neutral, total = total + excluded.total, "
+                "score_sum = score_sum + excluded.score_sum",
+                [(model_id, *row) for row in counts.itertuples(index=False, name=None)],
+            )
+            for product, days in counts.groupby("product_name")["date"]:
+                _refresh_rolling(conn, model_id, product, days.min(), days.max())
+        if last_rowid is not None:
+            conn.execute("INSERT OR REPLACE INTO sentiment_progress VALUES (?, ?)", [model_id, last_rowid])
+    return len(counts)
+
+
+def refresh_daily_sentiment(conn, model_id, score_fn, batch_rows=10_000):
+    """
+    Score reviews added since the last refresh and fold them into sentiment_daily.
+
+    score_fn takes a list of texts and returns (labels, scores). Results go
+    through the sentiment cache under model_id. Returns the number of
+    reviews processed (0 when nothing is new).
+    """
+    row = conn.execute("SELECT last_rowid FROM sentiment_progress WHERE model_id = ?", [model_id]).fetchone()
+    last_rowid = row[0] if row else 0
+    processed = 0
+    while True:
+        batch = pd.read_sql_query(
+            "SELECT rowid, product_name, date, review_hash FROM reviews WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            conn,
+            params=[last_rowid, batch_rows],
+        )
+        if batch.empty:
+            return processed
+        batch = attach_review_text(conn, batch)
+        batch["label"], batch["score"] = cached_sentiment(batch["review"].tolist(), model_id, score_fn)
+        last_rowid = int(batch["rowid"].max())
+        add_scored_reviews(conn, model_id, batch, last_rowid)
+        processed += len(batch)
+
+
+def daily_sentiment(conn, product, model_id, start=None, end=None):
+    """A product's daily sentiment rows in date order."""
+    query = "SELECT * FROM sentiment_daily WHERE model_id = ? AND product_name = ?"
+    params = [model_id, product]
+    if start is not None:
+        query += " AND date >= ?"
+        params.append(pd.Timestamp(start).strftime("%Y-%m-%d"))
+    if end is not None:
+        query += " AND date <= ?"
+        params.append(pd.Timestamp(end).strftime("%Y-%m-%d"))
+    daily = pd.read_sql_query(query + " ORDER BY date", conn, params=params)
+    daily["date"] = pd.to_datetime(daily["date"])
+    return daily
+
+
+def label_counts(daily):
+    """Collapse daily rows into a label/count frame for the distribution charts."""
+    totals = daily[LABEL_COLUMNS].sum() if not daily.empty else pd.Series(0, index=LABEL_COLUMNS)
+    return pd.DataFrame({"label": [column.upper() for column in LABEL_COLUMNS], "count": totals.to_numpy()})
@@ -0,0 +1,188 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from sentiment import SENTIMENT_BATCH_SIZE, SENTIMENT_MODEL
+
+CHUNK_SIZE = 5_000
+BACKENDS = ("torch", "onnx", "cascade", "vader")
+MANIFEST_FILE = "manifest.json"
+# Manifest entries describing the input file's contents (size and hash)
+INPUT_STATE_KEYS = ("input_size", "input_sha1")
+
+_worker_settings = {}
+
+
+def shard_dir_for(output_path):
+    return f"{output_path}.shards"
+
+
+def _shard_path(shard_dir, index):
+    return os.path.join(shard_dir, f"shard_{index:06d}.csv")
+
+
+def _init_worker(model_id, backend, batch_size):
+    # Each worker process loads its own copy of the model, once
+    from model_registry import get_sentiment_pipeline, get_vader
+
+    _worker_settings.update(model_id=model_id, backend=backend, batch_size=batch_size)
+    if backend == "vader":
+        get_vader()
+    else:
+        get_sentiment_pipeline(model_id, "onnx" if backend == "onnx" else "torch")
+
+
+def _score(texts):
+    from model_registry import get_sentiment_pipeline
+    from sentiment import score_reviews
+    from sentiment_cascade import cascade_sentiment
+    from vader_sentiment import score_vader
+
+    model_id, backend, batch_size = (_worker_settings[key] for key in ("model_id", "backend", "batch_size"))
+    if backend == "vader":
+        return score_vader(texts)
+    analyzer = get_sentiment_pipeline(model_id, "onnx" if backend == "onnx" else "torch")
+    if backend == "cascade":
+        labels, scores, _ = cascade_sentiment(texts, analyzer=analyzer, batch_size=batch_size)
+        return labels, scores
+    return score_reviews(texts, analyzer, batch_size)
+
+
+def _score_shard(index, chunk, text_column, shard_dir):
+    """Score one chunk and write it as a shard; the rename marks it complete."""
+    labels, scores = _score(chunk[text_column].tolist())
+    chunk = chunk.assign(Sentiment=labels, SentimentScore=scores)
+    path = _shard_path(shard_dir, index)
+    chunk.to_csv(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+    return index, len(chunk)
+
+
+def _file_digest(path, limit=None):
+    """SHA-1 of a file's contents, or of its first `limit` bytes."""
+    hasher = hashlib.sha1()
+    remaining = os.path.getsize(path) if limit is None else limit
+    with open(path, "rb") as f:
+        while remaining > 0:
+            block = f.read(min(remaining, 1 << 20))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher.hexdigest()
+
+
+def _check_manifest(shard_dir, settings, input_path):
+    """
+    Refuse to resume shards produced with different settings or from a
+    different input. If rows were only appended to the input, the last
+    shard (which may hold a partial chunk) is dropped so it is rescored.
+    """
+    path = os.path.join(shard_dir, MANIFEST_FILE)
+    settings = dict(settings, input_size=os.path.getsize(input_path), input_sha1=_file_digest(input_path))
+    if os.path.exists(path):
+        with open(path) as f:
+            previous = json.load(f)
+        unchanged = all(previous.get(key) == value for key, value in settings.items() if key not in INPUT_STATE_KEYS)
+        if unchanged and previous != settings and previous.get("input_size", 0) < settings["input_size"] \
+                and _file_digest(input_path, previous.get("input_size", 0)) == previous.get("input_sha1"):
+            shards = sorted(glob.glob(os.path.join(shard_dir, "shard_*.csv")))
+            if shards:
+                os.remove(shards[-1])
+            print(f"{input_path} grew since the last run; rescoring from its last chunk.")
+        elif previous != settings:
+            raise ValueError(f"{shard_dir} was started with {previous}; remove it to backfill with {settings}.")
+    with open(path + ".tmp", "w") as f:
+        json.dump(settings, f)
+    os.replace(path + ".tmp", path)
+
+
+def merge_shards(shard_dir, output_path):
+    """Concatenate the shards in order into output_path, one shard in memory at a time."""
+    shards = sorted(glob.glob(os.path.join(shard_dir, "shard_*.csv")))
+    with open(output_path + ".tmp", "w", newline="") as out:
+        for i, path in enumerate(shards):
+            pd.read_csv(path).to_csv(out, index=False, header=i == 0)
+    os.replace(output_path + ".tmp", output_path)
+    return len(shards)
+
+
+def backfill(input_path, output_path, model_id=SENTIMENT_MODEL, backend="torch", workers=None,
+             chunk_size=CHUNK_SIZE, batch_size=SENTIMENT_BATCH_SIZE, text_column=None, keep_shards=False):
+    """
+    Rescore a reviews file with a sentiment model.
+
+    The input is streamed in chunks of chunk_size rows, and each chunk is
+    scored in a worker process and written as its own shard. Shards that
+    already exist are skipped, so a crashed run resumes where it stopped.
+    Once all shards exist they are merged into output_path.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}.")
+    workers = workers or os.cpu_count() or 1
+    shard_dir = shard_dir_for(output_path)
+    os.makedirs(shard_dir, exist_ok=True)
+    _check_manifest(shard_dir, {"input": os.path.abspath(input_path), "model": model_id, "backend": backend,
+                                "chunk_size": chunk_size}, input_path)
+
+    if backend == "onnx":
+        # Export once here; otherwise every worker would export and quantize the same files at startup
+        try:
+            from onnx_sentiment import export_quantized
+
+            export_quantized(model_id)
+        except ImportError as e:
+            print(f"ONNX backend unavailable ({e}); workers will use the PyTorch pipeline.")
+
+    start = time.perf_counter()
+    scored = skipped = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_id, backend, batch_size)) as pool:
+        pending = set()
+        for index, chunk in enumerate(pd.read_csv(input_path, chunksize=chunk_size)):
+            if os.path.exists(_shard_path(shard_dir, index)):
+                skipped += 1
+                continue
+            if text_column is None:
+                # reviews.csv uses "review" (SCRAEP.py) or "review_statements" (scrape.py)
+                text_column = "review" if "review" in chunk.columns else "review_statements"
+            pending.add(pool.submit(_score_shard, index, chunk, text_column, shard_dir))
+            # Keep at most two chunks per worker in memory
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    scored += future.result()[1]
+        for future in pending:
+            scored += future.result()[1]
+
+    shards = merge_shards(shard_dir, output_path)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {scored:,} reviews in {elapsed:.1f}s ({skipped} shards resumed); "
+          f"merged {shards} shards into {output_path}")
+    if not keep_shards:
+        for path in glob.glob(os.path.join(shard_dir, "*")):
+            os.remove(path)
+        os.rmdir(shard_dir)
+    return scored
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rescore a reviews file with a sentiment model.")
+    parser.add_argument("input", help="reviews.csv or review_statements.csv")
+    parser.add_argument("output", help="CSV with Sentiment and SentimentScore columns added.")
+    parser.add_argument("--model", default=SENTIMENT_MODEL, help="Transformers model id.")
+    parser.add_argument("--backend", choices=BACKENDS, default="torch", help="Scoring backend.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores).")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per shard.")
+    parser.add_argument("--batch-size", type=int, default=SENTIMENT_BATCH_SIZE, help="Transformer batch size.")
+    parser.add_argument("--text-column", default=None, help="Review text column (default: auto-detect).")
+    parser.add_argument("--keep-shards", action="store_true", help="Keep the shard directory after merging.")
+    args = parser.parse_args()
+    backfill(args.input, args.output, args.model, args.backend, args.workers, args.chunk_size, args.batch_size,
+             args.text_column, args.keep_shards)
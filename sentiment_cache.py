@@ -0,0 +1,162 @@
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from normalize import hash_review_text
+
+
+CACHE_PATH = "sentiment_cache.db"
+MAX_ENTRIES = 500_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sentiment_cache (
+    model_id TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    label TEXT NOT NULL,
+    score REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (model_id, text_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_sentiment_cache_last_used ON sentiment_cache (last_used);
+"""
+
+
+class SentimentCache:
+    """
+    Persistent sentiment results keyed by (model id, normalized review hash).
+
+    Entries are evicted least-recently-used first once the cache grows past
+    max_entries. Hit and miss counters cover the life of the object.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        # Running row count, so store() only scans the table when eviction may be due
+        self._count = self._conn.execute("SELECT COUNT(*) FROM sentiment_cache").fetchone()[0]
+
+    def lookup(self, model_id, hashes):
+        """Return {hash: (label, score)} for the cached hashes and refresh their recency."""
+        hashes = list(dict.fromkeys(hashes))
+        found = {}
+        with self._lock:
+            for i in range(0, len(hashes), 500):
+                chunk = hashes[i:i + 500]
+                query = ("SELECT text_hash, label, score FROM sentiment_cache "
+                         f"WHERE model_id = ? AND text_hash IN ({', '.join('?' * len(chunk))})")
+                for text_hash, label, score in self._conn.execute(query, [model_id] + chunk):
+                    found[text_hash] = (label, score)
+            if found:
+                now = time.time()
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE sentiment_cache SET last_used = ? WHERE model_id = ? AND text_hash = ?",
+                        [(now, model_id, text_hash) for text_hash in found],
+                    )
+        return found
+
+    def store(self, model_id, results):
+        """Save {hash: (label, score)} and evict the oldest entries beyond max_entries."""
+        now = time.time()
+        rows = [(model_id, text_hash, label, float(score), now) for text_hash, (label, score) in results.items()]
+        with self._lock, self._conn:
+            inserted = self._conn.executemany("INSERT OR IGNORE INTO sentiment_cache VALUES (?, ?, ?, ?, ?)",
+                                              rows).rowcount
+            if inserted < len(rows):
+                # Some hashes were already cached (e.g. by another process): overwrite them
+                self._conn.executemany(
+                    "UPDATE sentiment_cache SET label = ?, score = ?, last_used = ? WHERE model_id = ? AND text_hash = ?",
+                    [(label, score, used, model, text_hash) for model, text_hash, label, score, used in rows],
+                )
+            self._count += inserted
+            if self._count > self.max_entries:
+                # Recount first: other processes may share the cache file
+                self._count = self._conn.execute("SELECT COUNT(*) FROM sentiment_cache").fetchone()[0]
+                excess = self._count - self.max_entries
+                if excess > 0:
+                    self._conn.execute(
+                        "DELETE FROM sentiment_cache WHERE rowid IN "
+                        "(SELECT rowid FROM sentiment_cache ORDER BY last_used LIMIT ?)",
+                        (excess,),
+                    )
+                    self._count -= excess
+
+    def record(self, hits, misses):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+            entries = self._conn.execute("SELECT COUNT(*) FROM sentiment_cache").fetchone()[0]
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_cache(path=CACHE_PATH):
+    """Process-wide cache shared by Streamlit sessions and scrape workers."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = SentimentCache(path)
+        return _shared_cache
+
+
+def cached_sentiment(texts, model_id, score_fn, cache=None):
+    """
+    Score reviews, sending only unseen texts to score_fn.
+
+    score_fn takes a list of texts and returns (labels, scores). Returns
+    (labels, scores) NumPy arrays in the input order.
+    """
+    cache = cache or get_cache()
+    texts = list(texts)
+    hashes = hash_review_text(texts).tolist()
+    labels = np.empty(len(texts), dtype=object)
+    scores = np.zeros(len(texts), dtype="float64")
+
+    found = cache.lookup(model_id, [h for h in hashes if h is not None])
+    missing = {}
+    uncacheable = []
+    for position, text_hash in enumerate(hashes):
+        if text_hash is None:
+            uncacheable.append(position)
+        elif text_hash in found:
+            labels[position], scores[position] = found[text_hash]
+        else:
+            missing.setdefault(text_hash, []).append(position)
+
+    missed_rows = sum(len(positions) for positions in missing.values())
+    cache.record(len(texts) - len(uncacheable) - missed_rows, missed_rows)
+
+    # Score each unseen review once, plus rows without text (never cached)
+    to_score = [texts[positions[0]] for positions in missing.values()] + [texts[i] for i in uncacheable]
+    if to_score:
+        new_labels, new_scores = score_fn(to_score)
+        new_results = {}
+        for (text_hash, positions), label, score in zip(missing.items(), new_labels, new_scores):
+            labels[positions] = label
+            scores[positions] = score
+            new_results[text_hash] = (label, score)
+        labels[uncacheable] = list(new_labels[len(missing):])
+        scores[uncacheable] = list(new_scores[len(missing):])
+        cache.store(model_id, new_results)
+    return labels, scores
@@ -0,0 +1,82 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from model_registry import get_sentiment_pipeline, get_vader
+from sentiment import SENTIMENT_BATCH_SIZE, SENTIMENT_MODEL, score_reviews
+from vader_sentiment import vader_compound
+
+# Reviews with a VADER compound score inside this band are sent to the transformer
+AMBIGUOUS_BAND = (-0.5, 0.5)
+
+
+def cascade_model_id(band=AMBIGUOUS_BAND, model_id=SENTIMENT_MODEL):
+    """Cache and aggregate key for cascade results (they depend on the band and the model)."""
+    return f"cascade:{model_id}:{band[0]}:{band[1]}"
+
+
+def cascade_sentiment(texts, band=AMBIGUOUS_BAND, vader=None, analyzer=None, batch_size=SENTIMENT_BATCH_SIZE):
+    """
+    Score every review with VADER and escalate only the ambiguous ones.
+
+    Reviews whose compound score lies inside `band` (inclusive) go to the
+    transformer. The rest are labelled from VADER, using the transformer's
+    POSITIVE/NEGATIVE labels and (1 + |compound|) / 2 as the score.
+    Returns (labels, scores, escalated) NumPy arrays in the input order.
+    """
+    texts = list(texts)
+    compound = vader_compound(texts, vader)
+    escalated = (compound >= band[0]) & (compound <= band[1])
+
+    labels = np.where(compound > 0, "POSITIVE", "NEGATIVE").astype(object)
+    scores = (1 + np.abs(compound)) / 2
+    if escalated.any():
+        analyzer = analyzer or get_sentiment_pipeline()
+        positions = np.flatnonzero(escalated)
+        labels[positions], scores[positions] = score_reviews([texts[i] for i in positions], analyzer, batch_size)
+    return labels, scores, escalated
+
+
+def cascade_report(texts, band=AMBIGUOUS_BAND, vader=None, analyzer=None, batch_size=SENTIMENT_BATCH_SIZE):
+    """
+    Time the cascade against sending every review to the transformer.
+    Returns the escalated fraction, label agreement, timings and cost saved.
+    """
+    texts = list(texts)
+    vader = vader or get_vader()
+    analyzer = analyzer or get_sentiment_pipeline()
+
+    start = time.perf_counter()
+    full_labels, _ = score_reviews(texts, analyzer, batch_size)
+    transformer_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    labels, _, escalated = cascade_sentiment(texts, band, vader, analyzer, batch_size)
+    cascade_seconds = time.perf_counter() - start
+
+    return {
+        "reviews": len(texts),
+        "band": band,
+        "escalated_fraction": float(escalated.mean()) if len(texts) else 0.0,
+        "agreement": float((labels == full_labels).mean()) if len(texts) else 1.0,
+        "transformer_seconds": transformer_seconds,
+        "cascade_seconds": cascade_seconds,
+        "cost_saved": 1 - cascade_seconds / transformer_seconds if transformer_seconds else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    # Usage: python sentiment_cascade.py [reviews.csv] [band_low] [band_high]
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "reviews.csv"
+    band = (float(sys.argv[2]), float(sys.argv[3])) if len(sys.argv) > 3 else AMBIGUOUS_BAND
+    reviews = pd.read_csv(path)
+    column = "review" if "review" in reviews.columns else "review_statements"
+    report = cascade_report(reviews[column].tolist(), band)
+    print(f"Reviews: {report['reviews']}, ambiguous band: {report['band']}")
+    print(f"Escalated to the transformer: {report['escalated_fraction']:.1%}")
+    print(f"Label agreement with transformer-only: {report['agreement']:.1%}")
+    print(f"Transformer only: {report['transformer_seconds']:.2f}s, cascade: {report['cascade_seconds']:.2f}s "
+          f"({report['cost_saved']:.0%} saved)")
@@ -0,0 +1,259 @@
+import sqlite3
+import sys
+
+import pandas as pd
+
+from normalize import hash_review_text, normalize_review_text, normalize_scraped
+
+
+DB_PATH = "competitor_tracker.db"
+SCHEMA_VERSION = 2
+
+SNAPSHOT_COLUMNS = ["product_name", "date", "price", "mrp", "discount", "rating", "reviews",
+                    "availability", "review_hash"]
+REVIEW_COLUMNS = ["product_name", "date", "review_hash", "rating"]
+TABLES = ["competitor_snapshots", "reviews", "review_texts", "sentiment_daily", "sentiment_progress",
+          "discount_forecasts", "arima_orders", "arima_state", "price_features", "feature_progress"]
+
+# Review text is stored once in review_texts; snapshots and reviews refer to it by hash
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS review_texts (
+    review_hash TEXT PRIMARY KEY,
+    review TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS competitor_snapshots (
+    product_name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    price REAL,
+    mrp REAL,
+    discount REAL,
+    rating REAL,
+    reviews REAL,
+    availability TEXT,
+    review_hash TEXT REFERENCES review_texts (review_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_product_date ON competitor_snapshots (product_name, date);
+CREATE INDEX IF NOT EXISTS idx_snapshots_date ON competitor_snapshots (date);
+
+CREATE TABLE IF NOT EXISTS reviews (
+    product_name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    review_hash TEXT REFERENCES review_texts (review_hash),
+    rating REAL
+);
+CREATE INDEX IF NOT EXISTS idx_reviews_product_date ON reviews (product_name, date);
+
+-- Daily sentiment per product and model, maintained by sentiment_aggregates.py
+CREATE TABLE IF NOT EXISTS sentiment_daily (
+    model_id TEXT NOT NULL,
+    product_name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    positive INTEGER NOT NULL,
+    negative INTEGER NOT NULL,
+    neutral INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    mean_score REAL,
+    rolling_7d REAL,
+    rolling_30d REAL,
+    PRIMARY KEY (model_id, product_name, date)
+);
+
+-- Last reviews rowid folded into sentiment_daily for each model
+CREATE TABLE IF NOT EXISTS sentiment_progress (
+    model_id TEXT PRIMARY KEY,
+    last_rowid INTEGER NOT NULL
+);
+
+-- Discount forecasts written by forecast_store.py after each scrape
+CREATE TABLE IF NOT EXISTS discount_forecasts (
+    product_name TEXT NOT NULL,
+    arima_order TEXT NOT NULL,
+    date TEXT NOT NULL,
+    predicted_discount REAL,
+    lower_bound REAL,
+    upper_bound REAL,
+    last_observed TEXT NOT NULL,
+    generated_at TEXT NOT NULL,
+    PRIMARY KEY (product_name, arima_order, date)
+);
+
+-- ARIMA order picked per product by arima_order.py
+CREATE TABLE IF NOT EXISTS arima_orders (
+    product_name TEXT PRIMARY KEY,
+    arima_order TEXT NOT NULL,
+    aic REAL,
+    n_observations INTEGER NOT NULL,
+    searched_at TEXT NOT NULL
+);
+
+-- Fitted ARIMA state per product (pickled results live in arima_state/)
+CREATE TABLE IF NOT EXISTS arima_state (
+    product_name TEXT PRIMARY KEY,
+    arima_order TEXT NOT NULL,
+    last_observed TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    fitted_at TEXT NOT NULL
+);
+
+-- Per-product model features maintained by feature_store.py
+CREATE TABLE IF NOT EXISTS price_features (
+    product_name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    price REAL,
+    discount REAL,
+    price_lag_1 REAL,
+    price_lag_7 REAL,
+    discount_lag_1 REAL,
+    discount_lag_7 REAL,
+    price_mean_7 REAL,
+    discount_mean_7 REAL,
+    price_volatility_7 REAL,
+    discount_volatility_7 REAL,
+    day_of_week INTEGER,
+    next_price REAL,
+    next_discount REAL,
+    PRIMARY KEY (product_name, date)
+);
+
+-- Last competitor_snapshots rowid folded into price_features, and the feature definitions used
+CREATE TABLE IF NOT EXISTS feature_progress (
+    source TEXT PRIMARY KEY,
+    feature_version TEXT NOT NULL,
+    last_rowid INTEGER NOT NULL
+);
+"""
+
+def connect(db_path=DB_PATH):
+    """Open the embedded store and create tables and indexes if needed."""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        # Older layouts are rebuilt; bootstrap() re-seeds them from the history files
+        with conn:
+            for table in TABLES:
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _store_review_texts(conn, texts):
+    """Insert each distinct review once and return the hash of every input row."""
+    hashes = hash_review_text(texts)
+    unique = pd.DataFrame({"review_hash": hashes, "review": normalize_review_text(texts)})
+    unique = unique.dropna(subset=["review_hash"]).drop_duplicates("review_hash")
+    conn.executemany("INSERT OR IGNORE INTO review_texts VALUES (?, ?)", unique.itertuples(index=False, name=None))
+    return hashes
+
+
+def _prepare(conn, df, columns, text_column):
+    df = df.rename(columns={"title": "product_name"})
+    if "review_hash" in columns:
+        texts = df[text_column] if text_column in df.columns else pd.Series([None] * len(df), index=df.index)
+        df["review_hash"] = _store_review_texts(conn, texts)
+    df = normalize_scraped(df).reindex(columns=columns)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.strftime("%Y-%m-%d")
+    df = df.dropna(subset=["product_name", "date"])
+    return df.astype(object).where(df.notna(), None)
+
+
+def insert_snapshots(conn, df):
+    placeholders = ", ".join("?" * len(SNAPSHOT_COLUMNS))
+    with conn:
+        rows = _prepare(conn, df, SNAPSHOT_COLUMNS, "review_statements")
+        conn.executemany(f"INSERT INTO competitor_snapshots VALUES ({placeholders})",
+                         rows.itertuples(index=False, name=None))
+    return len(rows)
+
+
+def insert_reviews(conn, df):
+    # reviews.csv uses "review" (SCRAEP.py) or "review_statements" (scrape.py)
+    text_column = "review" if "review" in df.columns else "review_statements"
+    placeholders = ", ".join("?" * len(REVIEW_COLUMNS))
+    with conn:
+        rows = _prepare(conn, df, REVIEW_COLUMNS, text_column)
+        conn.executemany(f"INSERT INTO reviews VALUES ({placeholders})", rows.itertuples(index=False, name=None))
+    return len(rows)
+
+
+def attach_review_text(conn, df, text_column="review"):
+    """Join review text back onto rows that carry a review_hash, fetching only the hashes present."""
+    df = df.copy()
+    hashes = df["review_hash"].dropna().unique().tolist() if "review_hash" in df.columns else []
+    texts = {}
+    # Stay under SQLite's bound-parameter limit
+    for i in range(0, len(hashes), 500):
+        chunk = hashes[i:i + 500]
+        query = f"SELECT review_hash, review FROM review_texts WHERE review_hash IN ({', '.join('?' * len(chunk))})"
+        texts.update(conn.execute(query, chunk).fetchall())
+    df[text_column] = df["review_hash"].map(texts) if "review_hash" in df.columns else None
+    return df
+
+
+def bootstrap(conn, load_competitor=None, load_reviews=None):
+    """
+    Fill empty tables from existing history. The loaders (e.g. the CSV or
+    Parquet loaders) are only called when their table is still empty.
+    """
+    if load_competitor is not None and conn.execute("SELECT 1 FROM competitor_snapshots LIMIT 1").fetchone() is None:
+        insert_snapshots(conn, load_competitor())
+    if load_reviews is not None and conn.execute("SELECT 1 FROM reviews LIMIT 1").fetchone() is None:
+        insert_reviews(conn, load_reviews())
+
+
+def _as_product_frame(df, product_col):
+    if product_col != "product_name":
+        df = df.rename(columns={"product_name": product_col})
+    return df
+
+
+def list_products(conn):
+    """Distinct product names, read from the (product_name, date) index."""
+    rows = conn.execute("SELECT DISTINCT product_name FROM competitor_snapshots ORDER BY product_name").fetchall()
+    return [row[0] for row in rows]
+
+
+def latest_date(conn):
+    row = conn.execute("SELECT MAX(date) FROM competitor_snapshots").fetchone()
+    return pd.Timestamp(row[0]) if row and row[0] else None
+
+
+def product_history(conn, product, start=None, end=None, product_col="product_name"):
+    """One product's snapshots in date order, as an index range scan."""
+    query = "SELECT * FROM competitor_snapshots WHERE product_name = ?"
+    params = [product]
+    if start is not None:
+        query += " AND date >= ?"
+        params.append(pd.Timestamp(start).strftime("%Y-%m-%d"))
+    if end is not None:
+        query += " AND date <= ?"
+        params.append(pd.Timestamp(end).strftime("%Y-%m-%d"))
+    query += " ORDER BY date"
+    return _as_product_frame(pd.read_sql_query(query, conn, params=params), product_col)
+
+
+def latest_snapshot(conn, product_col="product_name"):
+    """All products' rows for the most recent scrape date."""
+    query = ("SELECT * FROM competitor_snapshots "
+             "WHERE date = (SELECT MAX(date) FROM competitor_snapshots)")
+    return _as_product_frame(pd.read_sql_query(query, conn), product_col)
+
+
+def reviews_for_product(conn, product, product_col="product_name", with_text=True):
+    """A product's reviews; text is joined in only when with_text is set."""
+    query = "SELECT * FROM reviews WHERE product_name = ? ORDER BY date"
+    reviews = pd.read_sql_query(query, conn, params=[product])
+    if with_text:
+        reviews = attach_review_text(conn, reviews)
+    return _as_product_frame(reviews, product_col)
+
+
+if __name__ == "__main__":
+    # Usage: python sql_store.py [competitor_data.csv] [reviews.csv]
+    competitor_path = sys.argv[1] if len(sys.argv) > 1 else "competitor_data.csv"
+    reviews_path = sys.argv[2] if len(sys.argv) > 2 else "reviews.csv"
+    conn = connect()
+    print(f"Imported {insert_snapshots(conn, pd.read_csv(competitor_path))} snapshots from {competitor_path}")
+    print(f"Imported {insert_reviews(conn, pd.read_csv(reviews_path))} reviews from {reviews_path}")
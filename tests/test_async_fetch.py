@@ -0,0 +1,38 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from async_fetch import fetch_pages
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = self.path.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def _parse(content):
+    if content == b"/broken":
+        raise ValueError("unparseable page")
+    return content.decode("utf-8")
+
+
+def test_parse_error_fails_only_its_url(server_url):
+    urls = [f"{server_url}/a", f"{server_url}/broken", f"{server_url}/b"]
+    assert fetch_pages(urls, {}, parse=_parse) == ["/a", None, "/b"]
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from columnar_store import ensure_store, load_table, store_path_for, write_partitioned
+
+
+def test_new_batches_keep_review_and_rating_after_legacy_import(tmp_path):
+    csv_path = tmp_path / "reviews.csv"
+    store_dir = tmp_path / "store"
+    pd.DataFrame({
+        "date": ["2025-01-27"],
+        "title": ["Old P"],
+        "review_statements": ["old text"],
+    }).to_csv(csv_path, index=False)
+
+    ensure_store(str(csv_path), str(store_dir), renames={"review_statements": "review"})
+    batch = pd.DataFrame({"product_name": ["New P"], "review": ["new text"], "rating": [4.0],
+                          "date": ["2025-02-01"]})
+    write_partitioned(batch, store_path_for(str(csv_path), str(store_dir)))
+
+    stored = load_table(str(csv_path), store_dir=str(store_dir)).set_index("product_name")
+    assert "review_statements" not in stored.columns
+    assert stored.loc["Old P", "review"] == "old text"
+    assert stored.loc["New P", "review"] == "new text"
+    assert stored.loc["New P", "rating"] == 4.0
+    assert pd.isna(stored.loc["Old P", "rating"])
+
+    # A later batch is cast to the extended schema
+    write_partitioned(batch.assign(product_name="Newer P", rating=5), store_path_for(str(csv_path), str(store_dir)))
+    stored = load_table(str(csv_path), store_dir=str(store_dir)).set_index("product_name")
+    assert stored.loc["Newer P", "rating"] == 5.0
@@ -0,0 +1,27 @@
+import pandas as pd
+
+from forecast_store import AUTO_ORDER, save_forecast, stored_forecast
+from sql_store import connect
+
+
+def _add_snapshot(conn, product, date, discount):
+    conn.execute("INSERT INTO competitor_snapshots (product_name, date, discount) VALUES (?, ?, ?)",
+                 [product, date, discount])
+
+
+def test_stored_forecast_is_ignored_once_newer_prices_arrive():
+    conn = connect(":memory:")
+    _add_snapshot(conn, "P", "2025-01-01", 10.0)
+    _add_snapshot(conn, "P", "2025-01-02", 12.0)
+    forecast = pd.DataFrame({"Predicted_Discount": [11.0, 11.5], "Lower_Bound": [9.0, 9.5],
+                             "Upper_Bound": [13.0, 13.5]},
+                            index=pd.Index(pd.date_range("2025-01-03", periods=2), name="Date"))
+    save_forecast(conn, "P", AUTO_ORDER, forecast, pd.Timestamp("2025-01-02"))
+
+    stored = stored_forecast(conn, "P", AUTO_ORDER)
+    assert stored["Predicted_Discount"].tolist() == [11.0, 11.5]
+    assert stored_forecast(conn, "P", AUTO_ORDER, days=1).index.tolist() == [pd.Timestamp("2025-01-03")]
+
+    _add_snapshot(conn, "P", "2025-01-03", 15.0)
+    assert stored_forecast(conn, "P", AUTO_ORDER).empty
+    assert stored_forecast(conn, "Q", AUTO_ORDER).empty
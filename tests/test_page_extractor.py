@@ -0,0 +1,18 @@
+import pytest
+
+from page_extractor import FIELD_DEFAULTS, RENDERED_DEFAULTS, extract_product_fields, extract_rendered_fields
+
+
+@pytest.mark.parametrize("content", ["", "   \n\t", b"", b"  "])
+def test_blank_page_returns_defaults(content):
+    assert extract_product_fields(content) == FIELD_DEFAULTS
+    assert extract_rendered_fields(content) == RENDERED_DEFAULTS
+
+
+def test_fields_are_extracted():
+    page = ('<html><body><span class="a-price-whole">1,299</span>'
+            '<div id="availability"> In stock </div></body></html>')
+    fields = extract_product_fields(page)
+    assert fields["price"] == "1,299"
+    assert fields["availability"] == "In stock"
+    assert fields["title"] == ""
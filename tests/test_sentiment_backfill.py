@@ -0,0 +1,37 @@
+import os
+
+import pandas as pd
+import pytest
+
+from sentiment_backfill import backfill, shard_dir_for
+
+REVIEWS = ["great product", "awful quality", "love it", "broke in a day", "works fine"]
+
+
+def _write_reviews(path, reviews):
+    pd.DataFrame({"product_name": "P", "review": reviews}).to_csv(path, index=False)
+
+
+def test_resume_rescores_rows_appended_to_the_input(tmp_path):
+    input_path, output_path = tmp_path / "reviews.csv", tmp_path / "scored.csv"
+    _write_reviews(input_path, REVIEWS)
+    backfill(str(input_path), str(output_path), backend="vader", workers=1, chunk_size=2, keep_shards=True)
+
+    appended = ["best purchase ever", "terrible, returned it"]
+    _write_reviews(input_path, REVIEWS + appended)
+    backfill(str(input_path), str(output_path), backend="vader", workers=1, chunk_size=2, keep_shards=True)
+
+    scored = pd.read_csv(output_path)
+    assert scored["review"].tolist() == REVIEWS + appended
+    assert scored["Sentiment"].notna().all()
+
+
+def test_resume_refuses_a_rewritten_input(tmp_path):
+    input_path, output_path = tmp_path / "reviews.csv", tmp_path / "scored.csv"
+    _write_reviews(input_path, REVIEWS)
+    backfill(str(input_path), str(output_path), backend="vader", workers=1, chunk_size=2, keep_shards=True)
+
+    _write_reviews(input_path, ["changed"] + REVIEWS[1:] + ["extra row"])
+    with pytest.raises(ValueError):
+        backfill(str(input_path), str(output_path), backend="vader", workers=1, chunk_size=2, keep_shards=True)
+    assert os.path.exists(shard_dir_for(str(output_path)))
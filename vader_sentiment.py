@@ -0,0 +1,100 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from model_registry import get_vader
+
+# Compound cut-offs for the Positive/Negative labels (NLTK's recommended values)
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+CHUNK_SIZE = 20_000
+
+
+def vader_compound(texts, vader=None):
+    """VADER compound score per review (0.0 for missing text)."""
+    polarity_scores = (vader or get_vader()).polarity_scores
+    return np.fromiter(
+        (polarity_scores(text)["compound"] if isinstance(text, str) else 0.0 for text in texts),
+        dtype="float64",
+        count=len(texts),
+    )
+
+
+def vader_labels(compound):
+    """Bucket compound scores into Positive/Negative/Neutral in one pass."""
+    compound = np.asarray(compound, dtype="float64")
+    return np.select(
+        [compound >= POSITIVE_THRESHOLD, compound <= NEGATIVE_THRESHOLD],
+        ["Positive", "Negative"],
+        default="Neutral",
+    ).astype(object)
+
+
+def _score_chunk(texts):
+    # Runs in a worker; the registry gives each process its own analyzer
+    return vader_compound(texts)
+
+
+def score_vader(texts, workers=1, chunk_size=CHUNK_SIZE):
+    """
+    Score a whole Series or list of reviews with one shared analyzer.
+
+    With workers > 1 the reviews are split into chunks and scored in a
+    process pool, for backfills of millions of reviews. Returns
+    (labels, compound) NumPy arrays in the input order.
+    """
+    texts = pd.Series(texts).tolist()
+    if workers <= 1 or len(texts) <= chunk_size:
+        compound = vader_compound(texts)
+    else:
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            compound = np.concatenate(list(pool.map(_score_chunk, chunks)))
+    return vader_labels(compound), compound
+
+
+# Benchmark against the per-call analyzer and per-review if/elif loop
+def run_benchmark(n_reviews=200_000, workers=os.cpu_count() or 1):
+    from nltk.sentiment import SentimentIntensityAnalyzer
+
+    rng = np.random.default_rng(0)
+    words = ("great sound battery poor delivery value fast broke comfortable cheap "
+             "excellent awful quality love hate bass noise works fine returned").split()
+    reviews = pd.Series([" ".join(rng.choice(words, rng.integers(5, 60))) for _ in range(n_reviews)])
+    get_vader()
+
+    sample = reviews.head(20_000).tolist()
+    start = time.perf_counter()
+    analyzer = SentimentIntensityAnalyzer()
+    loop_labels = []
+    for review in sample:
+        score = analyzer.polarity_scores(review)
+        if score["compound"] >= 0.05:
+            loop_labels.append("Positive")
+        elif score["compound"] <= -0.05:
+            loop_labels.append("Negative")
+        else:
+            loop_labels.append("Neutral")
+    loop_time = (time.perf_counter() - start) * n_reviews / len(sample)
+
+    start = time.perf_counter()
+    labels, _ = score_vader(reviews)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pool_labels, _ = score_vader(reviews, workers=workers)
+    pool_time = time.perf_counter() - start
+
+    assert labels[:len(sample)].tolist() == loop_labels and (labels == pool_labels).all()
+    print(f"Reviews: {n_reviews:,}")
+    print(f"Per-review loop (extrapolated from {len(sample):,}): {n_reviews / loop_time:,.0f} reviews/s")
+    print(f"Batch scorer, one process: {n_reviews / batch_time:,.0f} reviews/s")
+    print(f"Batch scorer, {workers} processes: {n_reviews / pool_time:,.0f} reviews/s "
+          f"({loop_time / pool_time:.1f}x the loop)")
+
+
+if __name__ == "__main__":
+    run_benchmark()